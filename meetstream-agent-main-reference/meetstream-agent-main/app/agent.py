@@ -30,6 +30,12 @@ except Exception:
         MCPServerStdio, MCPServerSse,
         MCPServerStdioParams, MCPServerSseParams,
     )
+# Tool deadlines / thread offload (see tool_exec.py)
+try:
+    from .tool_exec import GuardedRealtimeAgent, run_in_thread
+except Exception:
+    from tool_exec import GuardedRealtimeAgent, run_in_thread
+
 # Optional HTTP client for weather
 try:
     import httpx
@@ -43,6 +49,7 @@ except Exception:  # pragma: no cover
     name_override="current_time",
     description_override="Return the current time in ISO 8601. Optional timezone as an IANA string, e.g., 'America/Toronto'.",
 )
+@run_in_thread
 def current_time(timezone_name: Optional[str] = None) -> str:
     try:
         if timezone_name:
@@ -342,7 +349,7 @@ Prefer tools when available:
 Keep spoken responses concise and avoid repeating prior text verbatim.
 """
 
-assistant_agent = RealtimeAgent(
+assistant_agent = GuardedRealtimeAgent(
     name="Meetstream Realtime Agent",
     handoff_description="Single agent with local tools and Playwright/Framer MCPs.",
     instructions=AGENT_INSTRUCTIONS,
@@ -0,0 +1,212 @@
+# audio_codecs.py — outbound (server -> Meetstream) audio encodings for `sendaudio`
+#
+# Supported encodings (the `encoding` field of the sendaudio envelope):
+#   pcm16      little-endian signed 16-bit, 2 bytes/sample (the original format)
+#   mulaw      G.711 μ-law, 1 byte/sample
+#   alaw       G.711 A-law, 1 byte/sample
+#   ima_adpcm  IMA/DVI ADPCM, one self-contained block per chunk:
+#              4-byte header (int16 LE first sample, uint8 step index, 0x00)
+#              followed by 4-bit codes for the remaining samples, low nibble first.
+#              Only offered at the 24 kHz passthrough rate: the encoder is a per-sample
+#              Python loop that holds the GIL (~12 ms CPU per second of 24 kHz audio,
+#              twice that at 48 kHz), so it must not be paired with upsampling.
+#
+# The receiver advertises what it can decode in the `ready` handshake on /bridge:
+#   {"type": "ready", "bot_id": "...",
+#    "accept_encodings": ["mulaw", "pcm16"], "accept_sample_rates": [24000, 48000]}
+# Receivers that advertise nothing keep getting pcm16 at MEETSTREAM_OUT_RATE.
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+MODEL_AUDIO_RATE = 24000  # realtime model output is 24 kHz PCM16
+
+# server-side preference order; the first one the receiver accepts wins
+OUT_ENCODING_PREFERENCE = [
+    e.strip() for e in os.getenv("MEETSTREAM_OUT_ENCODINGS", "mulaw,alaw,ima_adpcm,pcm16").split(",") if e.strip()
+]
+
+SUPPORTED_ENCODINGS = ("pcm16", "mulaw", "alaw", "ima_adpcm")
+
+
+# ─────────────────────────────── G.711 tables ─────────────────────────────────
+# Built once for every int16 value, so encoding is a single fancy-index.
+
+def _build_ulaw_table() -> np.ndarray:
+    x = np.arange(-32768, 32768, dtype=np.int32) >> 2          # 14-bit
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(x), 8159) + 0x21
+    seg_end = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+    seg = np.searchsorted(seg_end, mag, side="left")
+    uval = (seg << 4) | ((mag >> (seg + 1)) & 0xF)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return (uval ^ mask).astype(np.uint8)
+
+
+def _build_alaw_table() -> np.ndarray:
+    x = np.arange(-32768, 32768, dtype=np.int32) >> 3          # 13-bit
+    mask = np.where(x >= 0, 0xD5, 0x55)
+    mag = np.where(x >= 0, x, -x - 1)
+    seg_end = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+    seg = np.searchsorted(seg_end, mag, side="left")
+    shift = np.where(seg < 2, 1, seg)
+    aval = (seg << 4) | ((mag >> shift) & 0xF)
+    aval = np.where(seg >= 8, 0x7F, aval)
+    return (aval ^ mask).astype(np.uint8)
+
+
+_ULAW_TABLE = _build_ulaw_table()
+_ALAW_TABLE = _build_alaw_table()
+
+
+def encode_mulaw(pcm16: bytes) -> bytes:
+    x = np.frombuffer(pcm16, dtype=np.int16)
+    return _ULAW_TABLE[x.astype(np.int32) + 32768].tobytes()
+
+
+def encode_alaw(pcm16: bytes) -> bytes:
+    x = np.frombuffer(pcm16, dtype=np.int16)
+    return _ALAW_TABLE[x.astype(np.int32) + 32768].tobytes()
+
+
+# ─────────────────────────────── IMA ADPCM ────────────────────────────────────
+
+_IMA_INDEX_TABLE = [-1, -1, -1, -1, 2, 4, 6, 8, -1, -1, -1, -1, 2, 4, 6, 8]
+_IMA_STEP_TABLE = [
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767,
+]
+
+
+def encode_ima_adpcm(pcm16: bytes, step_index: int = 0) -> Tuple[bytes, int]:
+    """
+    Encode one block; returns (block, final step index) so the next block of the
+    same stream can start with an adapted step size.
+
+    The predictor update is inherently sequential, so the per-sample loop stays
+    in plain Python ints (faster than numpy scalars); nibble packing is vectorized.
+    """
+    samples = np.frombuffer(pcm16, dtype=np.int16)
+    if len(samples) == 0:
+        return b"", step_index
+    predictor = int(samples[0])
+    header = np.array([predictor], dtype="<i2").tobytes() + bytes((step_index, 0))
+
+    codes = np.empty(len(samples) - 1, dtype=np.uint8)
+    steps, index_adj = _IMA_STEP_TABLE, _IMA_INDEX_TABLE
+    index = step_index
+    for i, sample in enumerate(samples[1:].tolist()):
+        step = steps[index]
+        diff = sample - predictor
+        code = 0
+        if diff < 0:
+            code = 8
+            diff = -diff
+        delta = step >> 3
+        if diff >= step:
+            code |= 4
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 2
+            diff -= step
+            delta += step
+        step >>= 1
+        if diff >= step:
+            code |= 1
+            delta += step
+        predictor = predictor - delta if code & 8 else predictor + delta
+        if predictor > 32767:
+            predictor = 32767
+        elif predictor < -32768:
+            predictor = -32768
+        index += index_adj[code]
+        if index < 0:
+            index = 0
+        elif index > 88:
+            index = 88
+        codes[i] = code
+
+    if len(codes) % 2:
+        codes = np.append(codes, np.uint8(0))
+    packed = (codes[0::2] | (codes[1::2] << 4)).astype(np.uint8)
+    return header + packed.tobytes(), index
+
+
+# ───────────────────────────── Per-bot encoder ────────────────────────────────
+
+@dataclass
+class OutboundFormat:
+    encoding: str = "pcm16"
+    sample_rate: int = 48000
+
+    def envelope_fields(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {
+            "sample_rate": self.sample_rate,
+            "encoding": self.encoding,
+            "channels": 1,
+        }
+        if self.encoding == "pcm16":
+            fields["endianness"] = "little"
+        return fields
+
+
+class OutboundEncoder:
+    """Encodes resampled PCM16 for one bot's sendaudio stream (keeps ADPCM state)."""
+
+    def __init__(self, fmt: OutboundFormat):
+        self.format = fmt
+        self._adpcm_index = 0
+
+    def encode(self, pcm16: bytes) -> bytes:
+        enc = self.format.encoding
+        if enc == "mulaw":
+            return encode_mulaw(pcm16)
+        if enc == "alaw":
+            return encode_alaw(pcm16)
+        if enc == "ima_adpcm":
+            block, self._adpcm_index = encode_ima_adpcm(pcm16, self._adpcm_index)
+            return block
+        return pcm16
+
+    def reset(self):
+        """Call on interruption so the next utterance starts from a fresh step size."""
+        self._adpcm_index = 0
+
+
+def negotiate_outbound(init: Dict[str, Any], default_rate: int) -> OutboundFormat:
+    """Pick encoding + sample rate from the receiver's `ready` handshake."""
+    rates = []
+    for r in init.get("accept_sample_rates") or []:
+        try:
+            rates.append(int(r))
+        except (TypeError, ValueError):
+            continue
+    if not rates:
+        sample_rate = default_rate
+    elif MODEL_AUDIO_RATE in rates:
+        sample_rate = MODEL_AUDIO_RATE  # native passthrough, no resampling
+    elif default_rate in rates:
+        sample_rate = default_rate
+    else:
+        sample_rate = rates[0]
+
+    accepted: Optional[List[str]] = init.get("accept_encodings")
+    encoding = "pcm16"
+    if accepted:
+        accepted_set = {str(e).lower() for e in accepted}
+        for candidate in OUT_ENCODING_PREFERENCE:
+            if candidate == "ima_adpcm" and sample_rate != MODEL_AUDIO_RATE:
+                continue  # see module header: too slow at resampled rates
+            if candidate in SUPPORTED_ENCODINGS and candidate in accepted_set:
+                encoding = candidate
+                break
+    return OutboundFormat(encoding=encoding, sample_rate=sample_rate)
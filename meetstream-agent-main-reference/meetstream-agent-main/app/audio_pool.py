@@ -0,0 +1,90 @@
+# audio_pool.py — runs CPU-bound audio transforms (base64, resample, encode) off the event loop
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", str(min(8, os.cpu_count() or 2))))
+# chunks at or below this many (encoded) bytes are cheaper to transform inline than to hand off
+AUDIO_INLINE_MAX_BYTES = int(os.getenv("AUDIO_INLINE_MAX_BYTES", "2048"))
+
+
+class AudioExecutor:
+    """
+    Bounded thread pool for audio transforms, with one ordered lane per stream.
+
+    Each lane (e.g. "<bot_id>:in", "<bot_id>:out") has at most one job in flight,
+    so chunks of a stream are transformed in arrival order and the pool's queue
+    never holds more than one job per lane. NumPy/scipy and base64 release the GIL
+    for the heavy parts, so a few workers go a long way.
+    """
+
+    def __init__(self, max_workers: int = AUDIO_WORKERS, inline_max_bytes: int = AUDIO_INLINE_MAX_BYTES):
+        self.max_workers = max_workers
+        self.inline_max_bytes = inline_max_bytes
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio")
+        self._lanes: Dict[str, asyncio.Lock] = {}
+
+        # stats (waits are recorded from worker threads)
+        self._stats_lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=2048)
+        self.offloaded = 0
+        self.inlined = 0
+        self.max_wait = 0.0
+
+    async def run(self, lane: str, size: int, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run fn(*args) in lane order; inline when `size` is small."""
+        lock = self._lanes.get(lane)
+        if lock is None:
+            lock = self._lanes[lane] = asyncio.Lock()
+        async with lock:
+            if size <= self.inline_max_bytes:
+                self.inlined += 1
+                return fn(*args)
+            submitted = time.perf_counter()
+
+            def job():
+                self._record_wait(time.perf_counter() - submitted)
+                return fn(*args)
+
+            return await asyncio.get_running_loop().run_in_executor(self._pool, job)
+
+    def _record_wait(self, waited: float):
+        with self._stats_lock:
+            self.offloaded += 1
+            self._waits.append(waited)
+            if waited > self.max_wait:
+                self.max_wait = waited
+
+    def drop_lanes(self, bot_id: str):
+        for lane in [k for k in self._lanes if k.startswith(f"{bot_id}:")]:
+            self._lanes.pop(lane, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            max_wait = self.max_wait
+            offloaded = self.offloaded
+
+        def pct(p: float) -> float:
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000 if waits else 0.0
+
+        return {
+            "workers": self.max_workers,
+            "inline_max_bytes": self.inline_max_bytes,
+            "lanes": len(self._lanes),
+            "offloaded": offloaded,
+            "inlined": self.inlined,
+            "queue_wait_ms": {
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "p99": pct(0.99),
+                "max": max_wait * 1000,
+            },
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,200 @@
+# capture.py — append-only, memory-mapped per-bot capture of bridge traffic (for replay.py)
+#
+# File layout (little-endian):
+#   header: b"MSCAP001" | f64 wall-clock start | u16 len | bot_id utf-8
+#   frames: u64 t_ns (monotonic, since start) | u8 channel | u32 len | payload
+# A channel byte of 0 marks the end (files are grown in zero-filled steps, so a
+# capture cut short by a crash still reads cleanly up to the last full frame).
+import logging
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger("bridge.capture")
+
+CAPTURE_DIR = os.getenv("BRIDGE_CAPTURE_DIR")  # unset = capture off
+CAPTURE_GROW_BYTES = int(os.getenv("BRIDGE_CAPTURE_GROW_BYTES", str(8 * 1024 * 1024)))
+
+MAGIC = b"MSCAP001"
+_FRAME = struct.Struct("<QBI")
+
+# channels
+CH_END = 0
+CH_CONTROL_IN = 1      # text frames received on /bridge (incl. the ready handshake)
+CH_CONTROL_OUT = 2     # JSON sent to the control socket (sendaudio chunks elided, see CH_SESSION_AUDIO)
+CH_AUDIO_IN = 3        # text frames received on /bridge/audio (incl. the ready handshake)
+CH_SESSION_EVENT = 4   # RealtimeSession events, JSON
+CH_SESSION_AUDIO = 5   # RealtimeSession audio events, raw 24k PCM16
+
+CHANNEL_NAMES = {
+    CH_CONTROL_IN: "control_in",
+    CH_CONTROL_OUT: "control_out",
+    CH_AUDIO_IN: "audio_in",
+    CH_SESSION_EVENT: "session_event",
+    CH_SESSION_AUDIO: "session_audio",
+}
+
+
+@dataclass
+class Frame:
+    t_ns: int
+    channel: int
+    payload: bytes
+
+
+class CaptureWriter:
+    """
+    One capture file. Appends are a memcpy into a pre-grown mmap; the kernel
+    writes pages back in the background. The file is grown (ftruncate + remap)
+    in CAPTURE_GROW_BYTES steps. Not thread-safe: BridgeCapture drives every
+    writer from its own thread.
+    """
+
+    def __init__(self, path: str, bot_id: str, grow_bytes: int = CAPTURE_GROW_BYTES, start_ns: Optional[int] = None):
+        self.path = path
+        self._grow = grow_bytes
+        # O_EXCL: never overwrite an earlier capture of the same bot
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        self._size = 0
+        self._mm: Optional[mmap.mmap] = None
+        self._ensure(grow_bytes)
+        self._start_ns = start_ns if start_ns is not None else time.monotonic_ns()
+        bot = bot_id.encode("utf-8")
+        header = MAGIC + struct.pack("<dH", time.time(), len(bot)) + bot
+        self._mm[: len(header)] = header
+        self._pos = len(header)
+
+    def _ensure(self, needed: int):
+        if needed <= self._size:
+            return
+        new_size = max(needed, self._size + self._grow)
+        os.ftruncate(self._fd, new_size)
+        if self._mm is not None:
+            self._mm.close()
+        self._mm = mmap.mmap(self._fd, new_size)
+        self._size = new_size
+
+    def append(self, channel: int, payload: bytes, t_ns: Optional[int] = None):
+        end = self._pos + _FRAME.size + len(payload)
+        self._ensure(end + 1)  # +1 keeps room for the end marker
+        t_ns = (t_ns if t_ns is not None else time.monotonic_ns()) - self._start_ns
+        _FRAME.pack_into(self._mm, self._pos, max(0, t_ns), channel, len(payload))
+        self._mm[self._pos + _FRAME.size: end] = payload
+        self._pos = end
+
+    def close(self):
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._mm = None
+        os.ftruncate(self._fd, self._pos)
+        os.close(self._fd)
+
+
+class BridgeCapture:
+    """
+    Per-bot CaptureWriters under one directory; a no-op when directory is None.
+
+    record() only timestamps and queues a frame. Opening, growing and closing
+    files (msync + ftruncate) happen on one writer thread, so none of it runs
+    on the event loop.
+    """
+
+    def __init__(self, directory: Optional[str] = CAPTURE_DIR):
+        self.directory = directory
+        self.enabled = bool(directory)
+        # (bot_id, channel or None for close, monotonic ns, payload); None stops the writer
+        self._queue: "queue.SimpleQueue[Optional[Tuple[str, Optional[int], int, bytes]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._write_loop, name="capture", daemon=True)
+            self._thread.start()
+
+    def record(self, bot_id: str, channel: int, payload: Union[bytes, str]):
+        if not self.enabled or not bot_id:
+            return
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self._queue.put((bot_id, channel, time.monotonic_ns(), payload))
+
+    def close(self, bot_id: str):
+        if self.enabled:
+            self._queue.put((bot_id, None, 0, b""))
+
+    def close_all(self):
+        """Flush and close every file (blocking; call via asyncio.to_thread)."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+
+    # ── writer thread ─────────────────────────────────────────────────────────
+    def _open(self, bot_id: str, start_ns: int) -> CaptureWriter:
+        safe = re.sub(r"[^A-Za-z0-9_.-]", "_", bot_id)[:80]
+        stem = os.path.join(self.directory, f"{safe}-{time.time_ns()}")
+        path, n = f"{stem}.mscap", 0
+        while True:
+            try:
+                return CaptureWriter(path, bot_id, start_ns=start_ns)
+            except FileExistsError:
+                n += 1
+                path = f"{stem}-{n}.mscap"
+
+    def _write_loop(self):
+        writers: Dict[str, CaptureWriter] = {}
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                bot_id, channel, t_ns, payload = item
+                try:
+                    if channel is None:
+                        w = writers.pop(bot_id, None)
+                        if w is not None:
+                            w.close()
+                        continue
+                    w = writers.get(bot_id)
+                    if w is None:
+                        w = writers[bot_id] = self._open(bot_id, t_ns)
+                    w.append(channel, payload, t_ns)
+                except OSError as e:
+                    logger.error(f"capture write failed for {bot_id}: {e}")
+        finally:
+            for w in writers.values():
+                try:
+                    w.close()
+                except OSError as e:
+                    logger.error(f"capture close failed for {w.path}: {e}")
+
+
+def read_capture(path: str) -> Tuple[str, float, Iterator[Frame]]:
+    """Returns (bot_id, wall-clock start, frame iterator)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:8] != MAGIC:
+        raise ValueError(f"{path}: not a bridge capture")
+    started, n = struct.unpack_from("<dH", data, 8)
+    bot_id = data[18: 18 + n].decode("utf-8")
+
+    def frames() -> Iterator[Frame]:
+        pos = 18 + n
+        while pos + _FRAME.size <= len(data):
+            t_ns, channel, length = _FRAME.unpack_from(data, pos)
+            if channel == CH_END:
+                return
+            pos += _FRAME.size
+            if pos + length > len(data):
+                return
+            yield Frame(t_ns, channel, data[pos: pos + length])
+            pos += length
+
+    return bot_id, started, frames()
@@ -0,0 +1,196 @@
+# echo.py — signal-level suppression of the bot's own TTS coming back on /bridge/audio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+# Detection runs on a decimated copy of the 24 kHz model audio (24k / 3 = 8k),
+# which is plenty for speech correlation and keeps the FFTs small.
+ECHO_ENABLED = os.getenv("ECHO_SUPPRESSION", "1").lower() in ("1", "true", "yes")
+ECHO_WINDOW_S = float(os.getenv("ECHO_WINDOW_S", "2.0"))                # how much played audio each chunk is checked against
+ECHO_TAIL_S = float(os.getenv("ECHO_TAIL_S", "1.0"))                    # echo round-trip allowance past the playback time
+ECHO_SUPPRESS_THRESHOLD = float(os.getenv("ECHO_SUPPRESS_THRESHOLD", "0.6"))
+ECHO_ATTENUATE_THRESHOLD = float(os.getenv("ECHO_ATTENUATE_THRESHOLD", "0.35"))
+ECHO_ATTENUATION = float(os.getenv("ECHO_ATTENUATION", "0.2"))          # gain applied to partial matches
+
+_DETECT_DECIMATION = 3
+_DETECT_RATE = 24000 // _DETECT_DECIMATION
+_MIN_DETECT_SAMPLES = 80  # 10 ms at 8 kHz
+
+
+def _decimate(x: np.ndarray, factor: int) -> np.ndarray:
+    """Block-average decimation (cheap low-pass), x must be a multiple of factor."""
+    if factor == 1:
+        return x
+    return x.reshape(-1, factor).mean(axis=1)
+
+
+def _peak_ncc(ref: np.ndarray, x: np.ndarray) -> float:
+    """Peak normalized cross-correlation of x slid across ref, via a single FFT pair."""
+    n_ref, n_x = len(ref), len(x)
+    n_fft = 1 << (n_ref + n_x - 1).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(ref, n_fft) * np.conj(np.fft.rfft(x, n_fft)), n_fft)
+    corr = corr[: n_ref - n_x + 1]
+
+    # energy of every ref window of length n_x (sliding sum via cumsum)
+    csum = np.concatenate(([0.0], np.cumsum(ref.astype(np.float64) ** 2)))
+    win_energy = csum[n_x:] - csum[:-n_x]
+    x_energy = float(np.dot(x, x))
+    ncc = np.abs(corr) / np.sqrt(win_energy * x_energy + 1e-9)
+    return float(ncc.max()) if len(ncc) else 0.0
+
+
+class _ReferenceBuffer:
+    """
+    Recently sent (decimated) model audio for one bot, placed on its playback timeline.
+
+    The model streams audio faster than real time, so each chunk is stamped with
+    when it will actually be heard: right after the previous chunk, or now if the
+    meeting had already played everything we sent.
+    """
+
+    def __init__(self, keep_s: float):
+        self._keep_s = keep_s
+        self._segments: Deque[Tuple[float, np.ndarray]] = deque()  # (playback start, samples)
+        self._carry = np.zeros(0, dtype=np.float32)
+        self.play_end = 0.0
+        # pushes come from the outbound path, reads from the inbound one
+        self._lock = threading.Lock()
+
+    def push(self, samples: np.ndarray, now: float):
+        with self._lock:
+            x = np.concatenate((self._carry, samples)) if len(self._carry) else samples
+            usable = len(x) - (len(x) % _DETECT_DECIMATION)
+            self._carry = x[usable:].copy()
+            y = _decimate(x[:usable], _DETECT_DECIMATION).astype(np.float32)
+            if not len(y):
+                return
+            start = max(now, self.play_end)
+            self._segments.append((start, y))
+            self.play_end = start + len(y) / _DETECT_RATE
+            # forget audio that finished playing longer ago than anything we still check
+            while self._segments and self._segments[0][0] + len(self._segments[0][1]) / _DETECT_RATE < now - self._keep_s:
+                self._segments.popleft()
+
+    def interrupt(self, now: float):
+        """Playback was cut off: audio scheduled after `now` will never be heard."""
+        with self._lock:
+            kept: Deque[Tuple[float, np.ndarray]] = deque()
+            for start, y in self._segments:
+                if start >= now:
+                    break
+                n = int((now - start) * _DETECT_RATE)
+                kept.append((start, y[:n] if n < len(y) else y))
+            self._segments = kept
+            self._carry = np.zeros(0, dtype=np.float32)
+            self.play_end = min(self.play_end, now)
+
+    def window(self, lo: float, hi: float) -> np.ndarray:
+        """Samples scheduled to play between `lo` and `hi`, oldest first."""
+        with self._lock:
+            parts = []
+            for start, y in self._segments:
+                if start >= hi:
+                    break
+                if start + len(y) / _DETECT_RATE <= lo:
+                    continue
+                a = max(0, int((lo - start) * _DETECT_RATE))
+                b = min(len(y), int(math.ceil((hi - start) * _DETECT_RATE)))
+                parts.append(y[a:b])
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+
+class EchoSuppressor:
+    """
+    Keeps a reference of what each bot has said (24 kHz PCM16 model output) on
+    its playback timeline and drops or attenuates incoming 24 kHz chunks that
+    correlate with what was being played around the time they arrived.
+    """
+
+    def __init__(
+        self,
+        window_s: float = ECHO_WINDOW_S,
+        tail_s: float = ECHO_TAIL_S,
+        suppress_threshold: float = ECHO_SUPPRESS_THRESHOLD,
+        attenuate_threshold: float = ECHO_ATTENUATE_THRESHOLD,
+        attenuation: float = ECHO_ATTENUATION,
+        enabled: bool = ECHO_ENABLED,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.window_s = window_s
+        self.tail_s = tail_s
+        self.suppress_threshold = suppress_threshold
+        self.attenuate_threshold = attenuate_threshold
+        self.attenuation = attenuation
+        self._clock = clock
+        self._refs: Dict[str, _ReferenceBuffer] = {}
+        # playback cursor per bot when suppression is off (no reference is kept then)
+        self._play_end: Dict[str, float] = {}
+
+        # counters (read by admin/metrics endpoints)
+        self.suppressed = 0
+        self.attenuated = 0
+
+    def push_reference(self, bot_id: str, pcm_24k: bytes):
+        """Record model audio that is about to be played into the meeting."""
+        if not pcm_24k:
+            return
+        now = self._clock()
+        if not self.enabled:
+            self._play_end[bot_id] = max(now, self._play_end.get(bot_id, 0.0)) + len(pcm_24k) / (2 * 24000)
+            return
+        ref = self._refs.get(bot_id)
+        if ref is None:
+            ref = self._refs[bot_id] = _ReferenceBuffer(self.window_s + self.tail_s)
+        ref.push(np.frombuffer(pcm_24k, dtype=np.int16).astype(np.float32), now)
+
+    def interrupt(self, bot_id: str):
+        """The bot's audio was cut off (audio_interrupted): drop what was never played."""
+        now = self._clock()
+        ref = self._refs.get(bot_id)
+        if ref is not None:
+            ref.interrupt(now)
+        if bot_id in self._play_end:
+            self._play_end[bot_id] = min(self._play_end[bot_id], now)
+
+    def playback_remaining(self, bot_id: str) -> float:
+        """Seconds until the meeting has heard everything pushed for this bot."""
+        ref = self._refs.get(bot_id)
+        end = ref.play_end if ref is not None else self._play_end.get(bot_id, 0.0)
+        return max(0.0, end - self._clock())
+
+    def process(self, bot_id: str, pcm_24k: bytes) -> Optional[bytes]:
+        """Return the chunk (possibly attenuated), or None if it is our own echo."""
+        if not self.enabled:
+            return pcm_24k
+        ref = self._refs.get(bot_id)
+        now = self._clock()
+        # fast path: nothing of ours is playing or can still be echoing back
+        if ref is None or now > ref.play_end + self.tail_s:
+            return pcm_24k
+
+        x = np.frombuffer(pcm_24k, dtype=np.int16).astype(np.float32)
+        x = _decimate(x[: len(x) - (len(x) % _DETECT_DECIMATION)], _DETECT_DECIMATION)
+        # this chunk can only contain audio that played within window + round trip of now
+        reference = ref.window(now - self.window_s - self.tail_s, now)
+        if len(x) < _MIN_DETECT_SAMPLES or len(reference) < len(x) or not np.any(x):
+            return pcm_24k
+
+        peak = _peak_ncc(reference, x)
+        if peak >= self.suppress_threshold:
+            self.suppressed += 1
+            return None
+        if peak >= self.attenuate_threshold:
+            self.attenuated += 1
+            y = np.frombuffer(pcm_24k, dtype=np.int16).astype(np.float32) * self.attenuation
+            return y.astype(np.int16).tobytes()
+        return pcm_24k
+
+    def drop(self, bot_id: str):
+        self._refs.pop(bot_id, None)
+        self._play_end.pop(bot_id, None)
@@ -0,0 +1,178 @@
+# mixer.py — per-bot mixing of per-speaker PCMChunk streams into one fixed-cadence upstream stream
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+MIX_ENABLED = os.getenv("MEETSTREAM_MIXER", "1").lower() in ("1", "true", "yes")
+MIX_FRAME_MS = int(os.getenv("MEETSTREAM_MIX_FRAME_MS", "40"))            # upstream cadence
+MIX_MAX_BUFFER_MS = int(os.getenv("MEETSTREAM_MIX_MAX_BUFFER_MS", "400"))  # per-speaker jitter buffer cap
+MIX_MIN_RMS = float(os.getenv("MEETSTREAM_MIX_MIN_RMS", "150"))            # below this a speaker is muted (int16 units)
+MIX_DUCK_GAIN = float(os.getenv("MEETSTREAM_MIX_DUCK_GAIN", "0.7"))        # gain for everyone but the active speaker
+MIX_SPEAKER_IDLE_S = float(os.getenv("MEETSTREAM_MIX_SPEAKER_IDLE_S", "10"))
+
+_ENERGY_SMOOTHING = 0.3  # EMA weight of the newest frame's RMS
+
+
+class MixerClock:
+    """What the per-bot mixer task is paced by: the event loop clock. replay.py swaps in a virtual one."""
+
+    def time(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class _SpeakerStream:
+    def __init__(self):
+        self.chunks: Deque[np.ndarray] = deque()
+        self.buffered = 0          # samples queued
+        self.energy = 0.0          # smoothed RMS
+        self.last_seen = time.monotonic()
+
+    def append(self, x: np.ndarray):
+        if len(x):
+            self.chunks.append(x)
+            self.buffered += len(x)
+
+    def drop_oldest(self, n: int):
+        while n > 0 and self.chunks:
+            head = self.chunks[0]
+            if len(head) <= n:
+                self.chunks.popleft()
+                n -= len(head)
+                self.buffered -= len(head)
+            else:
+                self.chunks[0] = head[n:]
+                self.buffered -= n
+                n = 0
+
+    def pull_into(self, out: np.ndarray):
+        """Fill `out` from the queue; whatever is missing stays zero."""
+        filled = 0
+        while filled < len(out) and self.chunks:
+            head = self.chunks[0]
+            take = min(len(head), len(out) - filled)
+            out[filled: filled + take] = head[:take]
+            filled += take
+            if take == len(head):
+                self.chunks.popleft()
+            else:
+                self.chunks[0] = head[take:]
+        self.buffered -= filled
+
+
+class SpeakerMixer:
+    """
+    Buffers each speaker's 24 kHz PCM16 separately and, once per frame, mixes
+    them into a single mono frame (weighted sum + clip).
+
+    If chunks carry a `timestamp` (ms), each speaker buffer is aligned to the
+    mixer clock, so overlapping speakers line up instead of being concatenated.
+    Speakers below MIX_MIN_RMS are muted and everyone except the currently
+    dominant speaker is ducked by MIX_DUCK_GAIN.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 24000,
+        frame_ms: int = MIX_FRAME_MS,
+        max_buffer_ms: int = MIX_MAX_BUFFER_MS,
+        min_rms: float = MIX_MIN_RMS,
+        duck_gain: float = MIX_DUCK_GAIN,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.max_buffer = sample_rate * max_buffer_ms // 1000
+        self.min_rms = min_rms
+        self.duck_gain = duck_gain
+        self._streams: Dict[str, _SpeakerStream] = {}
+        # timestamp (ms) of the first sample at the head of every buffer; None = not anchored
+        self._clock_ms: Optional[float] = None
+        self.active_speaker: Optional[str] = None
+        self.frames_out = 0
+        self.chunks_in = 0
+
+    def push(self, speaker: str, pcm_24k: bytes, ts_ms: Optional[float] = None):
+        x = np.frombuffer(pcm_24k, dtype=np.int16).astype(np.float32)
+        if not len(x):
+            return
+        self.chunks_in += 1
+        stream = self._streams.get(speaker)
+        if stream is None:
+            stream = self._streams[speaker] = _SpeakerStream()
+        stream.last_seen = time.monotonic()
+
+        if ts_ms is not None:
+            if self._clock_ms is None:
+                self._clock_ms = float(ts_ms)
+            # where this chunk belongs relative to the buffer heads, vs. where the buffer ends
+            target = int(round((ts_ms - self._clock_ms) * self.sample_rate / 1000))
+            gap = target - stream.buffered
+            tolerance = self.frame_len // 2
+            if gap > tolerance:
+                stream.append(np.zeros(min(gap, self.max_buffer), dtype=np.float32))
+            elif gap < -tolerance and -gap < len(x):
+                x = x[-gap:]  # overlaps what is already queued: keep only the new tail
+        stream.append(x)
+        if stream.buffered > self.max_buffer:
+            stream.drop_oldest(stream.buffered - self.max_buffer)
+
+    def has_audio(self) -> bool:
+        return any(s.buffered for s in self._streams.values())
+
+    def mix(self) -> Optional[bytes]:
+        """Produce one frame of PCM16, or None when no speaker has anything queued."""
+        if not self.has_audio():
+            self._clock_ms = None  # re-anchor on the next timestamped chunk
+            self._forget_idle()
+            return None
+
+        names: List[str] = list(self._streams)
+        frames = np.zeros((len(names), self.frame_len), dtype=np.float32)
+        for i, name in enumerate(names):
+            self._streams[name].pull_into(frames[i])
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energies = np.array([self._streams[n].energy for n in names], dtype=np.float32)
+        energies = (1 - _ENERGY_SMOOTHING) * energies + _ENERGY_SMOOTHING * rms
+        for name, e in zip(names, energies.tolist()):
+            self._streams[name].energy = e
+
+        dominant = int(np.argmax(energies))
+        self.active_speaker = names[dominant] if energies[dominant] >= self.min_rms else None
+        weights = np.where(rms >= self.min_rms, self.duck_gain, 0.0).astype(np.float32)
+        if self.active_speaker is not None:
+            weights[dominant] = 1.0
+
+        mixed = np.clip(weights @ frames, -32768, 32767).astype(np.int16)
+        if self._clock_ms is not None:
+            self._clock_ms += self.frame_ms
+        self.frames_out += 1
+        return mixed.tobytes()
+
+    def _forget_idle(self):
+        now = time.monotonic()
+        for name in [n for n, s in self._streams.items() if not s.buffered and now - s.last_seen > MIX_SPEAKER_IDLE_S]:
+            self._streams.pop(name, None)
+
+    def activity(self) -> Dict[str, Any]:
+        return {
+            "active_speaker": self.active_speaker,
+            "frame_ms": self.frame_ms,
+            "chunks_in": self.chunks_in,
+            "frames_out": self.frames_out,
+            "speakers": {
+                name: {
+                    "rms": round(s.energy, 1),
+                    "active": s.energy >= self.min_rms,
+                    "buffered_ms": s.buffered * 1000 // self.sample_rate,
+                }
+                for name, s in self._streams.items()
+            },
+        }
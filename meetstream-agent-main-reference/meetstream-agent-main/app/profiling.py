@@ -0,0 +1,157 @@
+# profiling.py — hot-path logging, on-demand stage timers and a sampling profiler
+#
+# Everything here is off by default and costs one attribute check per call site
+# when off. Output of both profilers is the "collapsed stack" format
+# (`frame;frame;frame <count>`) that flamegraph.pl / speedscope / inferno read.
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+HOT_LOG_INTERVAL_S = float(os.getenv("BRIDGE_HOT_LOG_INTERVAL_S", "10"))  # per-key log interval on hot paths
+PROFILE_SAMPLE_MS = float(os.getenv("BRIDGE_PROFILE_SAMPLE_MS", "5"))
+PROFILE_MAX_SECONDS = int(os.getenv("BRIDGE_PROFILE_MAX_SECONDS", "120"))
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def install_queue_logging():
+    """Move root log handlers behind a QueueHandler so formatting + I/O happen on a thread."""
+    global _queue_listener
+    root = logging.getLogger()
+    if _queue_listener is not None or not root.handlers:
+        return
+    handlers = list(root.handlers)
+    q: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    for h in handlers:
+        root.removeHandler(h)
+    root.addHandler(logging.handlers.QueueHandler(q))
+    _queue_listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def stop_queue_logging():
+    """Flush queued records and put the original handlers back (call last on shutdown)."""
+    global _queue_listener
+    listener, _queue_listener = _queue_listener, None
+    if listener is None:
+        return
+    listener.stop()  # drains the queue before the thread exits
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        if isinstance(h, logging.handlers.QueueHandler):
+            root.removeHandler(h)
+    for h in listener.handlers:
+        root.addHandler(h)
+
+
+class HotPathLog:
+    """
+    Rate-limited, structured logging for per-chunk paths: each key logs at most
+    once per interval, with how many events were folded into that line.
+    """
+
+    def __init__(self, logger: logging.Logger, interval_s: float = HOT_LOG_INTERVAL_S):
+        self._logger = logger
+        self._interval = interval_s
+        self._next: Dict[str, float] = {}
+        self._counts: Dict[str, int] = defaultdict(int)
+
+    def event(self, key: str, **fields):
+        self._counts[key] += 1
+        now = time.monotonic()
+        if now < self._next.get(key, 0.0):
+            return
+        self._next[key] = now + self._interval
+        count = self._counts.pop(key, 1)
+        if self._logger.isEnabledFor(logging.INFO):
+            kv = " ".join(f"{k}={v!r}" for k, v in fields.items())
+            self._logger.info(f"{key} count={count} {kv}".rstrip())
+
+    def forget(self, prefix: str):
+        for key in [k for k in self._next if k.startswith(prefix)]:
+            self._next.pop(key, None)
+            self._counts.pop(key, None)
+
+
+class StageTimers:
+    """
+    Per-stage wall time for the bridge pipeline, optionally limited to one bot.
+
+    Call sites do `t0 = PROFILER.start()` ... `if t0: PROFILER.stop(bot_id, "ingest;transform", t0)`;
+    start() returns 0.0 while timers are off.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.bot_id: Optional[str] = None
+        self._totals: Dict[str, float] = defaultdict(float)
+
+    def start(self) -> float:
+        return time.perf_counter() if self.active else 0.0
+
+    def stop(self, bot_id: str, stage: str, t0: float):
+        if self.bot_id is not None and bot_id != self.bot_id:
+            return
+        self._totals[f"bridge;bot={bot_id};{stage}"] += time.perf_counter() - t0
+
+    def begin(self, bot_id: Optional[str] = None):
+        self._totals = defaultdict(float)
+        self.bot_id = bot_id
+        self.active = True
+
+    def end(self) -> str:
+        """Stop and return collapsed stacks weighted in microseconds."""
+        self.active = False
+        totals, self._totals = self._totals, defaultdict(float)
+        return "".join(f"{stack} {int(sec * 1e6)}\n" for stack, sec in sorted(totals.items()) if sec > 0)
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval from a helper thread."""
+
+    def __init__(self, interval_s: float = PROFILE_SAMPLE_MS / 1000):
+        self.interval_s = interval_s
+        self._counts: Dict[str, int] = defaultdict(int)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval_s):
+            for t in threading.enumerate():
+                names[t.ident] = t.name
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self._counts[";".join(reversed(stack))] += 1
+
+    def begin(self):
+        self._counts = defaultdict(int)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def end(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        counts, self._counts = self._counts, defaultdict(int)
+        return "".join(f"{stack} {n}\n" for stack, n in sorted(counts.items()))
+
+
+PROFILER = StageTimers()
+SAMPLER = SamplingProfiler()
@@ -0,0 +1,310 @@
+# replay.py — feed a captured meeting (.mscap, see capture.py) back through BridgeManager
+#
+#   cd app && uv run python replay.py captures/<bot>-<ts>.mscap --speed 4
+#
+# The realtime backend is faked: session events are emitted on their captured
+# timeline, Meetstream inputs are fed on theirs, and the control socket is a
+# recorder. What gets measured is the bridge itself (ingest, transforms, pump),
+# so runs are comparable across commits and machines. The speaker mixer is paced
+# by capture time rather than the wall clock, so upstream output is the same at
+# every --speed, and queued mixer frames / tool-output parts are flushed before
+# the session is torn down.
+import argparse
+import asyncio
+import heapq
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from starlette.websockets import WebSocketState
+
+try:
+    from . import capture as cap
+    from .mixer import MixerClock
+    from .transcripts import TranscriptStore
+    from .server import BridgeManager, negotiate_outbound, OUTGOING_AUDIO_RATE
+except Exception:
+    import capture as cap
+    from mixer import MixerClock
+    from transcripts import TranscriptStore
+    from server import BridgeManager, negotiate_outbound, OUTGOING_AUDIO_RATE
+
+
+def _pct(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": _pct(values, 0.50) * 1000,
+        "p95": _pct(values, 0.95) * 1000,
+        "p99": _pct(values, 0.99) * 1000,
+        "max": (max(values) if values else 0.0) * 1000,
+    }
+
+
+class _Dumped:
+    """Stands in for a history item: model_dump() returns the captured dict."""
+
+    def __init__(self, data: Dict[str, Any]):
+        self._data = data
+
+    def model_dump(self, mode: str = "json") -> Dict[str, Any]:
+        return self._data
+
+
+def _rebuild_event(frame: cap.Frame) -> Any:
+    """Captured frame -> object shaped like the RealtimeSessionEvent the pump expects."""
+    if frame.channel == cap.CH_SESSION_AUDIO:
+        return SimpleNamespace(type="audio", audio=SimpleNamespace(data=frame.payload))
+    p = json.loads(frame.payload)
+    t = p.get("type")
+    ev = SimpleNamespace(type=t)
+    if t == "raw_model_event":
+        ev.data = SimpleNamespace(**p["raw_model_event"])
+    elif t in ("agent_start", "agent_end"):
+        ev.agent = SimpleNamespace(name=p.get("agent"))
+    elif t == "handoff":
+        ev.from_agent = SimpleNamespace(name=p.get("from"))
+        ev.to_agent = SimpleNamespace(name=p.get("to"))
+    elif t in ("tool_start", "tool_end"):
+        ev.tool = SimpleNamespace(name=p.get("tool"))
+        ev.output = p.get("output")
+    elif t == "history_updated":
+        # captures record only the length (older ones the full dump)
+        items = p["history"] if "history" in p else [{}] * int(p.get("history_len") or 0)
+        ev.history = [_Dumped(item) for item in items]
+    elif t == "history_added":
+        ev.item = _Dumped(p.get("item") or {})
+    elif t == "guardrail_tripped":
+        ev.guardrail_results = [
+            SimpleNamespace(guardrail=SimpleNamespace(name=r.get("name"))) for r in p.get("guardrail_results") or []
+        ]
+    elif t == "error":
+        ev.error = p.get("error")
+    return ev
+
+
+class VirtualClock(MixerClock):
+    """Mixer clock that only moves when replay advances it to a frame's capture time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers: List[Tuple[float, int, "asyncio.Future[None]"]] = []
+        self._seq = 0
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._seq += 1
+        heapq.heappush(self._sleepers, (self.now + seconds, self._seq, fut))
+        await fut
+
+    async def advance(self, t: float):
+        """Move to `t`, waking every sleeper due on the way in deadline order."""
+        await asyncio.sleep(0)  # tasks created since the last advance get to start first
+        while self._sleepers and self._sleepers[0][0] <= t:
+            deadline, _, fut = heapq.heappop(self._sleepers)
+            self.now = max(self.now, deadline)
+            if fut.done():
+                continue
+            waiting = len(self._sleepers)
+            fut.set_result(None)
+            # let the woken task run until it sleeps again (or exits)
+            for _ in range(100):
+                await asyncio.sleep(0)
+                if len(self._sleepers) > waiting:
+                    break
+        self.now = max(self.now, t)
+
+
+class FakeRealtimeSession:
+    """Async-iterable session that yields scheduled events and records what it is sent."""
+
+    def __init__(self, stats: "ReplayStats"):
+        self._queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._stats = stats
+
+    def emit(self, event: Any):
+        if event is not None and getattr(event, "type", None) == "audio":
+            self._stats.audio_emitted.append(time.perf_counter())
+        self._queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self._queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    async def send_audio(self, pcm: bytes):
+        self._stats.audio_in_bytes += len(pcm)
+        self._stats.upstream_audio_frames += 1
+
+    async def send_text(self, text: str):
+        self._stats.text_in += 1
+
+    async def interrupt(self):
+        self._stats.interrupts += 1
+
+
+class _FakeSessionContext:
+    def __init__(self, session: FakeRealtimeSession):
+        self._session = session
+
+    async def __aenter__(self):
+        return self._session
+
+    async def __aexit__(self, *exc):
+        self._session.emit(None)
+
+
+class FakeControlSocket:
+    """Stands in for the Meetstream control WebSocket."""
+
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self, stats: "ReplayStats"):
+        self._stats = stats
+
+    async def send_text(self, text: str):
+        self._stats.on_control_out(json.loads(text))
+
+
+class ReplayStats:
+    def __init__(self):
+        self.ingest_latency: List[float] = []
+        self.audio_out_latency: List[float] = []
+        self.audio_emitted: List[float] = []
+        self.audio_in_bytes = 0
+        self.upstream_audio_frames = 0
+        self.text_in = 0
+        self.interrupts = 0
+        self.control_out: Dict[str, int] = {}
+        self.control_out_bytes = 0
+
+    def on_control_out(self, payload: Dict[str, Any]):
+        now = time.perf_counter()
+        cmd = payload.get("command") or payload.get("type") or "?"
+        self.control_out[cmd] = self.control_out.get(cmd, 0) + 1
+        self.control_out_bytes += len(json.dumps(payload))
+        if cmd == "sendaudio" and payload.get("audiochunk") and self.audio_emitted:
+            self.audio_out_latency.append(now - self.audio_emitted.pop(0))
+
+
+async def replay(path: str, speed: float = 1.0) -> Dict[str, Any]:
+    """Replay one capture; speed 0 means as fast as possible."""
+    bot_id, _, frames = cap.read_capture(path)
+    frames = list(frames)
+    stats = ReplayStats()
+    session = FakeRealtimeSession(stats)
+
+    async def session_factory():
+        return _FakeSessionContext(session)
+
+    clock = VirtualClock()
+    manager = BridgeManager(
+        session_factory=session_factory,
+        capture=cap.BridgeCapture(None),
+        transcripts=TranscriptStore(None),
+        mixer_clock=clock,
+    )
+    control = FakeControlSocket(stats)
+
+    inputs = [f for f in frames if f.channel in (cap.CH_CONTROL_IN, cap.CH_AUDIO_IN)]
+    events = [f for f in frames if f.channel in (cap.CH_SESSION_EVENT, cap.CH_SESSION_AUDIO)]
+
+    # control handshake (first ready on the control channel) negotiates the outbound format
+    init: Dict[str, Any] = {}
+    for f in inputs:
+        if f.channel == cap.CH_CONTROL_IN:
+            msg = json.loads(f.payload)
+            if msg.get("type") == "ready":
+                init = msg
+                break
+    await manager.attach_ms_control(bot_id, control, negotiate_outbound(init, OUTGOING_AUDIO_RATE))
+
+    loop = asyncio.get_running_loop()
+    t0 = loop.time()
+
+    async def wait_until(t_ns: int):
+        if speed > 0:
+            delay = t0 + t_ns / 1e9 / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await clock.advance(t_ns / 1e9)
+
+    async def drive_events():
+        for f in events:
+            await wait_until(f.t_ns)
+            session.emit(_rebuild_event(f))
+
+    async def drive_inputs():
+        for f in inputs:
+            await wait_until(f.t_ns)
+            msg = json.loads(f.payload)
+            if msg.get("type") == "ready":
+                continue
+            if f.channel == cap.CH_AUDIO_IN:
+                started = time.perf_counter()
+                await manager.handle_ms_audio_frame(bot_id, msg)
+                stats.ingest_latency.append(time.perf_counter() - started)
+            else:
+                await manager.handle_ms_command(bot_id, msg)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(drive_events(), drive_inputs())
+    # let the pump drain what is queued
+    while not session._queue.empty():
+        await asyncio.sleep(0.01)
+    # mix out whatever the speaker buffers still hold, then send queued tool-output parts
+    mixer = manager.mixers.get(bot_id)
+    while mixer is not None and mixer.has_audio():
+        await clock.advance(clock.now + mixer.frame_ms / 1000)
+    await manager.flush_tool_output(bot_id)
+    wall = time.perf_counter() - wall_start
+    await manager.close_session(bot_id)
+    manager.audio_pool.shutdown()
+
+    captured_s = (frames[-1].t_ns / 1e9) if frames else 0.0
+    audio_chunks = sum(1 for f in inputs if f.channel == cap.CH_AUDIO_IN)
+    return {
+        "capture": path,
+        "bot_id": bot_id,
+        "speed": speed,
+        "captured_s": captured_s,
+        "wall_s": wall,
+        "frames": {cap.CHANNEL_NAMES.get(c, str(c)): sum(1 for f in frames if f.channel == c) for c in cap.CHANNEL_NAMES},
+        "audio_in_chunks_per_s": audio_chunks / wall if wall else 0.0,
+        "upstream_audio_frames": stats.upstream_audio_frames,
+        "ingest_latency_ms": _summary_ms(stats.ingest_latency),
+        "audio_out_latency_ms": _summary_ms(stats.audio_out_latency),
+        "control_out": stats.control_out,
+        "control_out_bytes": stats.control_out_bytes,
+        "audio_pool": manager.audio_pool.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a bridge capture against a fake realtime backend.")
+    parser.add_argument("capture", nargs="+", help=".mscap file(s) written with BRIDGE_CAPTURE_DIR set")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = 4x, 0 = as fast as possible")
+    args = parser.parse_args()
+    for path in args.capture:
+        print(json.dumps(asyncio.run(replay(path, args.speed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 import asyncio
 import base64
+import hmac
 import json
 import logging
 import os
+import signal
 import struct
+import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import FileResponse
+from fastapi import Body, Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from typing_extensions import assert_never
 from starlette.websockets import WebSocketState
@@ -18,8 +21,36 @@ from starlette.websockets import WebSocketState
 from agents.realtime import RealtimeRunner, RealtimeSession, RealtimeSessionEvent
 try:
     from .agent import get_starting_agent  # when used as a package
+    from .echo import EchoSuppressor
+    from .audio_codecs import OutboundEncoder, OutboundFormat, negotiate_outbound
+    from .audio_pool import AudioExecutor
+    from . import capture as cap
+    from .mixer import MIX_ENABLED, MixerClock, SpeakerMixer
+    from .transcripts import TranscriptStore
+    from .profiling import PROFILE_MAX_SECONDS, PROFILER, SAMPLER, HotPathLog, install_queue_logging, stop_queue_logging
+    from .tool_exec import TOOL_STATS, install_parallel_dispatch
+    from . import tool_exec
+    from .ui_hub import UIHub, parse_classes
+    from .tool_output import (
+        TOOL_OUTPUT_AUDIO_QUIET_MS, TOOL_OUTPUT_MAX_CHARS, TOOL_OUTPUT_MAX_TOTAL,
+        format_tool_output, split_for_delivery,
+    )
 except Exception:
     from agent import get_starting_agent     # when run directly
+    from echo import EchoSuppressor
+    from audio_codecs import OutboundEncoder, OutboundFormat, negotiate_outbound
+    from audio_pool import AudioExecutor
+    import capture as cap
+    from mixer import MIX_ENABLED, MixerClock, SpeakerMixer
+    from transcripts import TranscriptStore
+    from profiling import PROFILE_MAX_SECONDS, PROFILER, SAMPLER, HotPathLog, install_queue_logging, stop_queue_logging
+    from tool_exec import TOOL_STATS, install_parallel_dispatch
+    import tool_exec
+    from ui_hub import UIHub, parse_classes
+    from tool_output import (
+        TOOL_OUTPUT_AUDIO_QUIET_MS, TOOL_OUTPUT_MAX_CHARS, TOOL_OUTPUT_MAX_TOTAL,
+        format_tool_output, split_for_delivery,
+    )
 
 import os, numpy as np
 try:
@@ -29,19 +60,66 @@ except Exception:
     _HAS_SCIPY = False
 
 logging.basicConfig(level=logging.INFO)
+install_queue_logging()  # log I/O happens on a listener thread, not the event loop
 logger = logging.getLogger("bridge")
+hot_log = HotPathLog(logger)  # per-chunk paths: at most one line per key per interval
 
+# Default display names treated as the bot itself. Extend at deploy time with
+# MEETSTREAM_IGNORED_SPEAKERS="Name A,Name B" or at runtime via /admin/ignored-speakers.
 IGNORED_SPEAKERS = {
     "Nav's test Meeting Agent",
     "Meetstream Agent",
     # add more display names here if needed
 }
+IGNORED_SPEAKERS |= {
+    s.strip() for s in os.getenv("MEETSTREAM_IGNORED_SPEAKERS", "").split(",") if s.strip()
+}
 
 
 # configure I/O rates (defaults keep working if envs not set)
 INCOMING_AUDIO_RATE = int(os.getenv("MEETSTREAM_IN_RATE", "48000"))   # ECS mic -> server
 OUTGOING_AUDIO_RATE = int(os.getenv("MEETSTREAM_OUT_RATE", "48000"))  # server -> ECS speaker
 
+# admission control (per node)
+MAX_LIVE_SESSIONS = int(os.getenv("BRIDGE_MAX_SESSIONS", "0"))                    # 0 = unlimited
+MAX_CONCURRENT_CREATES = int(os.getenv("BRIDGE_MAX_CONCURRENT_CREATES", "8"))     # parallel connects + MCP preconnects
+MAX_CREATE_QUEUE = int(os.getenv("BRIDGE_MAX_CREATE_QUEUE", "32"))                # waiting creates beyond this are refused
+CREATE_QUEUE_TIMEOUT_S = float(os.getenv("BRIDGE_CREATE_QUEUE_TIMEOUT_S", "10"))  # max wait for a create slot
+ADMISSION_RETRY_AFTER_S = int(os.getenv("BRIDGE_RETRY_AFTER_S", "5"))             # hint sent with refusals
+SESSION_IDLE_S = float(os.getenv("BRIDGE_SESSION_IDLE_S", "30"))                   # keep a detached bot's session this long for a reconnect
+
+# drain / shutdown
+DRAIN_DEADLINE_S = float(os.getenv("BRIDGE_DRAIN_DEADLINE_S", "20"))   # max wait for in-flight turns
+CLOSE_TIMEOUT_S = float(os.getenv("BRIDGE_CLOSE_TIMEOUT_S", "5"))      # per session / MCP server close budget
+
+# guarded admin/transcript routes need `Authorization: Bearer <token>`; unset = those routes are refused
+ADMIN_TOKEN = os.getenv("BRIDGE_ADMIN_TOKEN", "")
+if not ADMIN_TOKEN:
+    logger.warning("BRIDGE_ADMIN_TOKEN is not set: guarded admin and transcript routes will refuse every request")
+
+# tool output follow-up parts never wait longer than this for a gap in the bot's audio
+TOOL_OUTPUT_MAX_DEFER_S = float(os.getenv("TOOL_OUTPUT_MAX_DEFER_S", "10"))
+
+
+def require_admin(request: Request):
+    """FastAPI dependency guarding mutating /admin routes and meeting content."""
+    if not ADMIN_TOKEN:
+        # the peer address proves nothing (a local reverse proxy makes everyone loopback)
+        raise HTTPException(status_code=503, detail="admin routes disabled: BRIDGE_ADMIN_TOKEN is not set")
+    auth = request.headers.get("authorization", "")
+    token = auth[7:] if auth.lower().startswith("bearer ") else ""
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="admin token required", headers={"WWW-Authenticate": "Bearer"})
+
+
+class AdmissionRefused(Exception):
+    """Raised by ensure_session when the node cannot take another bot right now."""
+
+    def __init__(self, reason: str, retry_after: int = ADMISSION_RETRY_AFTER_S):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
 def _resample_pcm16(pcm_bytes: bytes, src_hz: int, dst_hz: int) -> bytes:
     if src_hz == dst_hz:
         return pcm_bytes
@@ -63,6 +141,20 @@ def _resample_pcm16(pcm_bytes: bytes, src_hz: int, dst_hz: int) -> bytes:
     y = np.clip(y, -32768, 32767).astype(np.int16)
     return y.tobytes()
 
+# Whole per-chunk transforms, run through the AudioExecutor (worker thread or inline).
+def _prepare_inbound(echo: EchoSuppressor, bot_id: str, b64: str) -> Optional[bytes]:
+    """Meetstream base64 PCM16 @ INCOMING_AUDIO_RATE -> 24k PCM16 (None = echo, drop)."""
+    pcm_in = base64.b64decode(b64)
+    pcm_24k = _resample_pcm16(pcm_in, INCOMING_AUDIO_RATE, 24000)
+    # drop/attenuate chunks that are our own TTS coming back from the meeting
+    return echo.process(bot_id, pcm_24k)
+
+def _prepare_outbound(echo: EchoSuppressor, encoder: OutboundEncoder, bot_id: str, raw_24k: bytes) -> str:
+    """Model 24k PCM16 -> base64 audiochunk in the bot's negotiated sendaudio format."""
+    echo.push_reference(bot_id, raw_24k)
+    raw_out = _resample_pcm16(raw_24k, 24000, encoder.format.sample_rate)
+    return base64.b64encode(encoder.encode(raw_out)).decode("utf-8")
+
 async def _preconnect_mcp(agent):
     """Connect all MCP servers on the agent before starting the session."""
     mcp_servers = getattr(agent, "mcp_servers", None) or []
@@ -77,6 +169,36 @@ async def _preconnect_mcp(agent):
         except Exception as e:
             logger.error(f"MCP connect failed for {getattr(srv,'name','<unnamed>')}: {e}")
 
+async def _open_realtime_session():
+    """Default session factory: starting agent + MCP preconnect -> RealtimeSession context."""
+    agent = get_starting_agent()
+    try:
+        await _preconnect_mcp(agent)
+    except Exception as e:
+        logger.error(f"Preconnect MCP failed: {e}")
+    runner = RealtimeRunner(agent)
+    return await runner.run()
+
+async def _cleanup_mcp(agent):
+    """Close all MCP servers on the agent concurrently, each within CLOSE_TIMEOUT_S."""
+    async def _one(srv):
+        try:
+            if hasattr(srv, "cleanup"):
+                await asyncio.wait_for(srv.cleanup(), timeout=CLOSE_TIMEOUT_S)
+        except Exception as e:
+            logger.warning(f"MCP cleanup failed for {getattr(srv,'name','<unnamed>')}: {e!r}")
+
+    mcp_servers = getattr(agent, "mcp_servers", None) or []
+    await asyncio.gather(*(_one(srv) for srv in mcp_servers))
+
+# raw model events worth capturing (the ones the pump acts on); audio deltas are
+# captured once, as CH_SESSION_AUDIO, from the non-raw audio event
+_CAPTURED_RAW_TYPES = {
+    "response.output_text.delta", "response.completed", "response.finished",
+    "response.error", "response.canceled",
+    "turn_started", "turn_ended", "transcript_delta", "input_audio_transcription_completed",
+}
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Manager that pairs:
 #   - a RealtimeSession (OpenAI) per bot_id
@@ -84,21 +206,73 @@ async def _preconnect_mcp(agent):
 #   - optional browser UI peers per session_id (unchanged from your demo)
 # ──────────────────────────────────────────────────────────────────────────────
 class BridgeManager:
-    def __init__(self):
+    def __init__(
+        self,
+        session_factory=None,
+        capture: Optional[cap.BridgeCapture] = None,
+        transcripts: Optional[TranscriptStore] = None,
+        mixer_clock: Optional[MixerClock] = None,
+    ):
+        # async () -> RealtimeSession context manager; replay.py swaps in a fake backend
+        self.session_factory = session_factory or _open_realtime_session
+        # optional record-and-replay capture (BRIDGE_CAPTURE_DIR)
+        self.capture = capture if capture is not None else cap.BridgeCapture()
+        # incremental transcript store (TRANSCRIPT_DB)
+        self.transcripts = transcripts if transcripts is not None else TranscriptStore()
+        # paces the per-bot mixer tasks (replay.py injects a virtual clock)
+        self.mixer_clock = mixer_clock or MixerClock()
+
         # OpenAI realtime sessions keyed by bot_id
         self.sessions: Dict[str, RealtimeSession] = {}
         self.session_contexts: Dict[str, Any] = {}
         self._text_buf: Dict[str, str] = {} 
         self.last_sent: Dict[str, str] = {}
 
-        # Meetstream control sockets keyed by bot_id
+        # Meetstream control / audio sockets keyed by bot_id
         self.ms_control_ws: Dict[str, WebSocket] = {}
+        self.ms_audio_ws: Dict[str, WebSocket] = {}
+        # sendaudio encoding negotiated on the control handshake, keyed by bot_id
+        self.ms_out_encoders: Dict[str, OutboundEncoder] = {}
 
-        # Browser UI (unchanged) keyed by session_id
+        # Browser UI sockets keyed by session_id
         self.ui_ws: Dict[str, WebSocket] = {}
 
-        # Map bot_id -> ui session_id (optional, populated when a UI joins with ?bot_id=)
-        self.bot_to_ui: Dict[str, str] = {}
+        # Per-bot fan-out to any number of UI observers (joined with ?bot_id=)
+        self.ui_hub = UIHub()
+
+        # Self-audio filtering: speaker names (runtime-configurable) + signal-level echo check
+        self.ignored_speakers: Set[str] = set(IGNORED_SPEAKERS)
+        self.echo = EchoSuppressor()
+
+        # Worker pool for base64/resample/encode (ordered per bot and direction)
+        self.audio_pool = AudioExecutor()
+
+        # Per-bot speaker mixers: one fixed-cadence upstream stream regardless of participants
+        self.mixers: Dict[str, SpeakerMixer] = {}
+        self._mix_tasks: Dict[str, asyncio.Task] = {}
+
+        # Admission control: live-session cap + bounded queue of in-progress creates
+        self.max_sessions = MAX_LIVE_SESSIONS
+        self._create_sem = asyncio.Semaphore(MAX_CONCURRENT_CREATES)
+        self._creating = 0
+        self._create_waiting = 0
+        self.refused = 0
+        # Sessions with nothing attached are released after this grace period (0 = at once)
+        self.session_idle_s = SESSION_IDLE_S
+        self._idle_release: Dict[str, asyncio.Task] = {}
+
+        # Large tool outputs: follow-up parts are sent in gaps between outbound audio
+        self._last_audio_out: Dict[str, float] = {}
+        self._tool_chunks: Dict[str, asyncio.Queue] = {}
+        self._tool_chunk_tasks: Dict[str, asyncio.Task] = {}
+        # in-flight tool calls per bot (parallel dispatch, see tool_exec.py)
+        self._tool_tasks: Dict[str, Set[asyncio.Task]] = {}
+
+        # Drain mode: refuse new bots, let in-flight turns finish, then hand bots off
+        self.draining = False
+        self._drain_task: Optional[asyncio.Task] = None
+        self._turn_active: Set[str] = set()
+        self._pump_tasks: Dict[str, asyncio.Task] = {}
 
         # Guard
         self._locks: Dict[str, asyncio.Lock] = {}
@@ -109,25 +283,71 @@ class BridgeManager:
         return self._locks[bot_id]
     
     
+    def _admit(self, bot_id: str):
+        """Fail fast if a new session would exceed the node's capacity."""
+        if self.draining:
+            self.refused += 1
+            raise AdmissionRefused("node draining", retry_after=0)
+        pending = self._creating + self._create_waiting
+        if self.max_sessions and len(self.sessions) + pending >= self.max_sessions:
+            self.refused += 1
+            raise AdmissionRefused("node at session capacity")
+        if self._create_waiting >= MAX_CREATE_QUEUE:
+            self.refused += 1
+            raise AdmissionRefused("session creation queue full")
+
     async def ensure_session(self, bot_id: str):
-        """Create an OpenAI Realtime session for this bot_id if needed."""
+        """Create an OpenAI Realtime session for this bot_id if needed.
+
+        Raises AdmissionRefused when the node is saturated.
+        """
+        if bot_id in self.sessions:
+            return
         async with self._lock_for(bot_id):
             if bot_id in self.sessions:
                 return
-            agent = get_starting_agent()
+            self._admit(bot_id)
+
+            self._create_waiting += 1
+            try:
+                await asyncio.wait_for(self._create_sem.acquire(), timeout=CREATE_QUEUE_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                self.refused += 1
+                raise AdmissionRefused("timed out waiting for a session creation slot")
+            finally:
+                self._create_waiting -= 1
+
+            self._creating += 1
             try:
-                await _preconnect_mcp(agent)
-            except Exception as e:
-                logger.error(f"Preconnect MCP failed: {e}")
-            runner = RealtimeRunner(agent)
-            ctx = await runner.run()
-            session = await ctx.__aenter__()
-            self.session_contexts[bot_id] = ctx
-            self.sessions[bot_id] = session
-            asyncio.create_task(self._pump_openai_events(bot_id))
+                ctx = await self.session_factory()
+                session = await ctx.__aenter__()
+                self.session_contexts[bot_id] = ctx
+                self.sessions[bot_id] = session
+                tool_tasks = install_parallel_dispatch(session)
+                if tool_tasks is not None:
+                    self._tool_tasks[bot_id] = tool_tasks
+                self._pump_tasks[bot_id] = asyncio.create_task(self._pump_openai_events(bot_id))
+            finally:
+                self._creating -= 1
+                self._create_sem.release()
+
+    def admission_stats(self) -> Dict[str, Any]:
+        return {
+            "live": len(self.sessions),
+            "creating": self._creating,
+            "waiting": self._create_waiting,
+            "refused": self.refused,
+            "idle": len(self._idle_release),
+            "max_sessions": self.max_sessions,
+            "max_concurrent_creates": MAX_CONCURRENT_CREATES,
+            "max_create_queue": MAX_CREATE_QUEUE,
+        }
 
     async def close_session(self, bot_id: str):
         async with self._lock_for(bot_id):
+            # unregister the pump first, so it knows the session was closed on purpose
+            self._pump_tasks.pop(bot_id, None)
+            self._cancel_idle_release(bot_id)
             if bot_id in self.session_contexts:
                 try:
                     await self.session_contexts[bot_id].__aexit__(None, None, None)
@@ -135,51 +355,243 @@ class BridgeManager:
                     logger.warning(f"__aexit__ error for {bot_id}: {e}")
                 self.session_contexts.pop(bot_id, None)
             self.sessions.pop(bot_id, None)
-
-    async def attach_ms_control(self, bot_id: str, ws: WebSocket):
+            self.echo.drop(bot_id)
+            self.audio_pool.drop_lanes(bot_id)
+            self.capture.close(bot_id)
+            task = self._mix_tasks.pop(bot_id, None)
+            if task:
+                task.cancel()
+            self.mixers.pop(bot_id, None)
+            self.transcripts.close_bot(bot_id)
+            self._turn_active.discard(bot_id)
+            hot_log.forget(f"{bot_id}:")
+            task = self._tool_chunk_tasks.pop(bot_id, None)
+            if task:
+                task.cancel()
+            self._tool_chunks.pop(bot_id, None)
+            self._last_audio_out.pop(bot_id, None)
+            for task in list(self._tool_tasks.pop(bot_id, ())):
+                task.cancel()
+
+    async def attach_ms_control(self, bot_id: str, ws: WebSocket, out_format: Optional[OutboundFormat] = None):
+        await self.ensure_session(bot_id)  # may raise AdmissionRefused before anything is registered
+        self._cancel_idle_release(bot_id)
         self.ms_control_ws[bot_id] = ws
-        await self.ensure_session(bot_id)
-        logger.info(f"[control connected] bot={bot_id}")
-
-    async def detach_ms_control(self, bot_id: str):
+        self.ms_out_encoders[bot_id] = OutboundEncoder(out_format or OutboundFormat(sample_rate=OUTGOING_AUDIO_RATE))
+        logger.info(f"[control connected] bot={bot_id} audio={self.ms_out_encoders[bot_id].format}")
+
+    async def attach_ms_audio(self, bot_id: str, ws: WebSocket):
+        await self.ensure_session(bot_id)  # may raise AdmissionRefused before anything is registered
+        self._cancel_idle_release(bot_id)
+        self.ms_audio_ws[bot_id] = ws
+        logger.info(f"[audio connected] bot={bot_id}")
+
+    async def detach_ms_control(self, bot_id: str, ws: Optional[WebSocket] = None):
+        if ws is not None and self.ms_control_ws.get(bot_id) is not ws:
+            return  # a newer control socket already took over
         self.ms_control_ws.pop(bot_id, None)
+        self.ms_out_encoders.pop(bot_id, None)
         logger.info(f"[control disconnected] bot={bot_id}")
+        await self._release_if_unused(bot_id)
 
-    async def attach_ui(self, session_id: str, ws: WebSocket, bot_id: Optional[str] = None):
+    async def detach_ms_audio(self, bot_id: str, ws: WebSocket):
+        if self.ms_audio_ws.get(bot_id) is not ws:
+            return
+        self.ms_audio_ws.pop(bot_id, None)
+        logger.info(f"[audio disconnected] bot={bot_id}")
+        await self._release_if_unused(bot_id)
+
+    def _in_use(self, bot_id: str) -> bool:
+        return bot_id in self.ms_control_ws or bot_id in self.ms_audio_ws or self.ui_hub.has_observers(bot_id)
+
+    async def _release_if_unused(self, bot_id: str):
+        """
+        Close the bot's session once no Meetstream socket or UI observer has been
+        attached for session_idle_s; a socket reattaching in that window keeps it.
+        """
+        if self._in_use(bot_id) or bot_id in self._idle_release:
+            return
+        if bot_id not in self.sessions and bot_id not in self.session_contexts:
+            return
+        if self.session_idle_s <= 0:
+            logger.info(f"[session released] bot={bot_id}")
+            await self.close_session(bot_id)
+            return
+        self._idle_release[bot_id] = asyncio.create_task(self._release_after_idle(bot_id))
+
+    async def _release_after_idle(self, bot_id: str):
+        await asyncio.sleep(self.session_idle_s)
+        if self._idle_release.get(bot_id) is asyncio.current_task():
+            self._idle_release.pop(bot_id, None)
+        if not self._in_use(bot_id) and (bot_id in self.sessions or bot_id in self.session_contexts):
+            logger.info(f"[session released] bot={bot_id} idle {self.session_idle_s}s")
+            await self.close_session(bot_id)
+
+    def _cancel_idle_release(self, bot_id: str):
+        task = self._idle_release.pop(bot_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    # ── Drain / shutdown ───────────────────────────────────────────────────────
+    async def drain(self, deadline_s: float = DRAIN_DEADLINE_S):
+        """Stop admitting bots, then hand every live bot off once its reply has played (or at the deadline)."""
+        if self._drain_task is None:
+            self.draining = True
+            logger.info(f"[drain] started: {len(self.sessions)} live bots, deadline {deadline_s}s")
+            self._drain_task = asyncio.create_task(self._drain_all(deadline_s))
+        await asyncio.shield(self._drain_task)
+
+    def resume(self):
+        """Leave drain mode and admit bots again (an unfinished drain is abandoned)."""
+        if self._drain_task is not None and not self._drain_task.done():
+            self._drain_task.cancel()
+        self._drain_task = None
+        self.draining = False
+        logger.info("[drain] resumed admission")
+
+    async def _drain_all(self, deadline_s: float):
+        deadline = asyncio.get_running_loop().time() + deadline_s
+        bots = set(self.sessions) | set(self.ms_control_ws) | set(self.ms_audio_ws)
+        await asyncio.gather(*(self._drain_bot(b, deadline) for b in bots), return_exceptions=True)
+        # anything still pumping after its session closed is abandoned, not awaited
+        for task in list(self._pump_tasks.values()):
+            task.cancel()
+        for ws in list(self.ui_ws.values()):
+            await _close_ws(ws, 1012)
+        logger.info("[drain] done")
+
+    async def _drain_bot(self, bot_id: str, deadline: float):
+        # the model generates faster than real time: wait for the turn to end *and* be heard
+        loop = asyncio.get_running_loop()
+        while loop.time() < deadline and (bot_id in self._turn_active or self.echo.playback_remaining(bot_id) > 0):
+            await asyncio.sleep(0.05)
+        ws = self.ms_control_ws.get(bot_id)
+        if ws is not None:
+            await _safe_send(ws, {"command": "reconnect", "reason": "draining", "bot_id": bot_id})
+        try:
+            await asyncio.wait_for(self.close_session(bot_id), timeout=CLOSE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            logger.warning(f"[drain] close_session timed out for {bot_id}")
+        for sock in (self.ms_control_ws.get(bot_id), self.ms_audio_ws.get(bot_id)):
+            if sock is not None:
+                await _close_ws(sock, 1012)  # 1012 = service restart
+
+    async def shutdown(self):
+        """Drain (bounded), then close MCP servers concurrently."""
+        await self.drain()
+        if self.session_factory is _open_realtime_session:
+            await _cleanup_mcp(get_starting_agent())
+
+    async def attach_ui(self, session_id: str, ws: WebSocket, bot_id: Optional[str] = None, classes: Optional[Set[str]] = None):
         self.ui_ws[session_id] = ws
         if bot_id:
-            self.bot_to_ui[bot_id] = session_id
-        logger.info(f"[ui connected] session={session_id} bot={bot_id}")
+            self._cancel_idle_release(bot_id)
+            self.ui_hub.subscribe(bot_id, session_id, ws, classes or parse_classes(None))
+        logger.info(f"[ui connected] session={session_id} bot={bot_id} events={sorted(classes or parse_classes(None))}")
 
-    async def detach_ui(self, session_id: str):
+    async def detach_ui(self, session_id: str, bot_id: Optional[str] = None):
         self.ui_ws.pop(session_id, None)
-        # also drop any reverse mapping
-        for b, s in list(self.bot_to_ui.items()):
-            if s == session_id:
-                self.bot_to_ui.pop(b, None)
+        bot_id = self.ui_hub.unsubscribe(session_id) or bot_id
         logger.info(f"[ui disconnected] session={session_id}")
+        if bot_id:
+            await self._release_if_unused(bot_id)
 
     # ── Inputs from Meetstream audio ───────────────────────────────────────────
-    async def ingest_ms_audio_b64(self, bot_id: str, b64: str):
+    async def ingest_ms_audio_b64(self, bot_id: str, b64: str, speaker: Optional[str] = None, ts_ms: Optional[float] = None):
         if not b64:
             return
+        t0 = PROFILER.start()
         try:
-            pcm_in = base64.b64decode(b64)
+            pcm_24k = await self.audio_pool.run(f"{bot_id}:in", len(b64), _prepare_inbound, self.echo, bot_id, b64)
         except Exception as e:
-            logger.warning(f"bad base64 for {bot_id}: {e}")
+            logger.warning(f"bad audio chunk for {bot_id}: {e}")
+            return
+        if t0:
+            PROFILER.stop(bot_id, "ingest;transform", t0)
+        if pcm_24k is None:
             return
-        pcm_24k = _resample_pcm16(pcm_in, INCOMING_AUDIO_RATE, 24000)
-        await self.ensure_session(bot_id)
         try:
+            await self.ensure_session(bot_id)
+            t0 = PROFILER.start()
+            if MIX_ENABLED and speaker is not None:
+                # the bot's mixer task sends one mixed frame per MIX_FRAME_MS
+                self._mixer_for(bot_id).push(speaker, pcm_24k, ts_ms)
+                if t0:
+                    PROFILER.stop(bot_id, "ingest;mixer_push", t0)
+                return
             await self.sessions[bot_id].send_audio(pcm_24k)
+            if t0:
+                PROFILER.stop(bot_id, "ingest;send_audio", t0)
         except Exception as e:
             logger.error(f"send_audio error for {bot_id}: {e}")
 
+    def _mixer_for(self, bot_id: str) -> SpeakerMixer:
+        mixer = self.mixers.get(bot_id)
+        if mixer is None:
+            mixer = self.mixers[bot_id] = SpeakerMixer()
+            self._mix_tasks[bot_id] = asyncio.create_task(self._run_mixer(bot_id, mixer, self.mixer_clock.time()))
+        return mixer
+
+    async def _run_mixer(self, bot_id: str, mixer: SpeakerMixer, next_tick: float):
+        clock = self.mixer_clock
+        period = mixer.frame_ms / 1000
+        try:
+            while True:
+                next_tick += period
+                t0 = PROFILER.start()
+                frame = mixer.mix()
+                if t0:
+                    PROFILER.stop(bot_id, "mixer;mix", t0)
+                session = self.sessions.get(bot_id)
+                if frame is not None and session is not None:
+                    t0 = PROFILER.start()
+                    try:
+                        await session.send_audio(frame)
+                    except Exception as e:
+                        logger.error(f"send_audio error for {bot_id}: {e}")
+                    if t0:
+                        PROFILER.stop(bot_id, "mixer;send_audio", t0)
+                delay = next_tick - clock.time()
+                if delay < 0:
+                    next_tick = clock.time()  # fell behind: skip ahead rather than burst
+                await clock.sleep(max(0.0, delay))
+        except asyncio.CancelledError:
+            pass
+
+    def is_ignored_speaker(self, speaker: Optional[str]) -> bool:
+        return bool(speaker) and speaker in self.ignored_speakers
+
+    async def handle_ms_audio_frame(self, bot_id: str, data: Dict[str, Any]):
+        """One parsed /bridge/audio message (after the ready handshake)."""
+        if data.get("type") != "PCMChunk":
+            return
+        speaker = data.get("speakerName", "")
+        if self.is_ignored_speaker(speaker):
+            # silently ignore agent/self audio
+            return
+        hot_log.event(f"{bot_id}:audio_chunk", bot=bot_id, speaker=speaker)
+        b64 = data.get("audioData")
+        if b64:
+            ts = data.get("timestamp")
+            ts_ms = float(ts) if isinstance(ts, (int, float)) else None
+            await self.ingest_ms_audio_b64(bot_id, b64, speaker=speaker or "", ts_ms=ts_ms)
+
+    async def handle_ms_command(self, bot_id: str, data: Dict[str, Any]):
+        """One parsed /bridge control message (after the ready handshake)."""
+        cmd = data.get("command")
+        if cmd == "usermsg":
+            msg = data.get("message", "")
+            if msg:
+                await self.ingest_ms_text(bot_id, msg)
+        elif cmd == "interrupt":
+            await self.interrupt(bot_id)
+        # (extend with other commands as needed)
+
     # ── Inputs from Meetstream text (control) ─────────────────────────────────
     async def ingest_ms_text(self, bot_id: str, text: str):
-        await self.ensure_session(bot_id)
         # If your API differs, replace with the correct call to push user text.
         try:
+            await self.ensure_session(bot_id)
             if hasattr(self.sessions[bot_id], "send_text"):
                 await self.sessions[bot_id].send_text(text)
             else:
@@ -201,15 +613,103 @@ class BridgeManager:
             logger.error(f"interrupt error for {bot_id}: {e}")
 
     # ── Outbound: pump OpenAI events to Meetstream control (and UI) ───────────
-    async def _pump_openai_events(self, bot_id: str):
+    async def _send_control(self, bot_id: str, ws: WebSocket, payload: dict):
+        if self.capture.enabled:
+            logged = payload
+            if payload.get("command") == "sendaudio":
+                # the audio itself is already captured as CH_SESSION_AUDIO
+                logged = {k: v for k, v in payload.items() if k != "audiochunk"}
+                logged["audiochunk_len"] = len(payload.get("audiochunk") or "")
+            self.capture.record(bot_id, cap.CH_CONTROL_OUT, json.dumps(logged))
+        await _safe_send(ws, payload)
+
+    def _capture_event(self, bot_id: str, event: RealtimeSessionEvent, payload: Optional[Dict[str, Any]]):
+        if event.type == "audio":
+            self.capture.record(bot_id, cap.CH_SESSION_AUDIO, event.audio.data)
+        elif event.type == "raw_model_event":
+            t = getattr(event.data, "type", None)
+            if t in _CAPTURED_RAW_TYPES:
+                raw = {"type": t}
+                for k in ("delta", "item_id", "transcript", "response_id"):
+                    if isinstance(getattr(event.data, k, None), str):
+                        raw[k] = getattr(event.data, k)
+                self.capture.record(bot_id, cap.CH_SESSION_EVENT, json.dumps({"type": "raw_model_event", "raw_model_event": raw}))
+        elif event.type == "history_updated":
+            # the length only: a full dump per update would grow the file O(n^2) over a meeting
+            self.capture.record(bot_id, cap.CH_SESSION_EVENT, json.dumps({"type": event.type, "history_len": len(event.history)}))
+        elif payload is not None:
+            self.capture.record(bot_id, cap.CH_SESSION_EVENT, json.dumps(payload))
+
+    async def _deliver_tool_output(self, bot_id: str, ws: WebSocket, tool_name: Optional[str], raw_output: Any):
+        """Format once, send the in-budget head now and queue the rest at low priority."""
+        size = len(raw_output) if isinstance(raw_output, str) else TOOL_OUTPUT_MAX_CHARS + 1
+        if size > TOOL_OUTPUT_MAX_CHARS:
+            parts = await asyncio.to_thread(lambda: split_for_delivery(format_tool_output(tool_name, raw_output)))
+        else:
+            parts = split_for_delivery(format_tool_output(tool_name, raw_output))
+        await self._send_control(bot_id, ws, {"command": "sendmsg", "message": parts[0], "bot_id": bot_id})
+        if len(parts) > 1:
+            q = self._tool_chunks.get(bot_id)
+            if q is None:
+                q = self._tool_chunks[bot_id] = asyncio.Queue()
+                self._tool_chunk_tasks[bot_id] = asyncio.create_task(self._drain_tool_chunks(bot_id, q))
+            for part in parts[1:]:
+                q.put_nowait(part)
+
+    async def _drain_tool_chunks(self, bot_id: str, q: asyncio.Queue):
+        quiet = TOOL_OUTPUT_AUDIO_QUIET_MS / 1000
         try:
-            session = self.sessions[bot_id]
+            while True:
+                part = await q.get()
+                # stay behind audio: wait for a gap in sendaudio (bounded, so a chatty bot can't starve us)
+                give_up = time.monotonic() + TOOL_OUTPUT_MAX_DEFER_S
+                while time.monotonic() < give_up:
+                    idle = time.monotonic() - self._last_audio_out.get(bot_id, 0.0)
+                    if idle >= quiet:
+                        break
+                    await asyncio.sleep(quiet - idle)
+                try:
+                    ws = self.ms_control_ws.get(bot_id)
+                    if ws and ws.client_state == WebSocketState.CONNECTED:
+                        await self._send_control(bot_id, ws, {"command": "sendmsg", "message": part, "bot_id": bot_id})
+                finally:
+                    q.task_done()
+        except asyncio.CancelledError:
+            pass
+
+    async def flush_tool_output(self, bot_id: str):
+        """Wait until every queued tool-output part for the bot has been sent."""
+        q = self._tool_chunks.get(bot_id)
+        if q is not None:
+            await q.join()
 
+    async def _pump_openai_events(self, bot_id: str):
+        session = self.sessions.get(bot_id)
+        if session is None:
+            return  # closed before the pump got to run
+        try:
             async for event in session:
                 # --- 1) Use raw model events for clean turn-based text ---
                 if event.type == "raw_model_event":
+                    if self.capture.enabled:
+                        self._capture_event(bot_id, event, None)
                     t = getattr(event.data, "type", None)
 
+                    # Track in-flight turns so drain can wait for them
+                    if t == "turn_started":
+                        self._turn_active.add(bot_id)
+                        continue
+                    if t == "turn_ended":
+                        self._turn_active.discard(bot_id)
+                        continue
+
+                    # User speech transcribed -> transcript store (before history catches up)
+                    if t == "input_audio_transcription_completed":
+                        self.transcripts.observe_transcript(
+                            bot_id, getattr(event.data, "item_id", ""), getattr(event.data, "transcript", "")
+                        )
+                        continue
+
                     # Streamed text delta from the model
                     if t == "response.output_text.delta":
                         delta = getattr(event.data, "delta", "") or ""
@@ -224,7 +724,7 @@ class BridgeManager:
                         if full:
                             ws = self.ms_control_ws.get(bot_id)
                             if ws and ws.client_state == WebSocketState.CONNECTED:
-                                await _safe_send(ws, {
+                                await self._send_control(bot_id, ws, {
                                     "command": "sendmsg",
                                     "message": full,
                                     "bot_id": bot_id
@@ -240,94 +740,83 @@ class BridgeManager:
                     continue
 
                 # --- 2) Non-raw events (audio, interruptions, etc.) ---
-                payload = await self._serialize_event(event)
-
-                # Send audio to Meetstream (upsampled to OUTGOING_AUDIO_RATE, e.g., 48k)
+                if event.type == "history_updated":
+                    self.transcripts.observe_history(bot_id, event.history)
+                elif event.type == "history_added":
+                    self.transcripts.observe_item(bot_id, event.item)
+                elif event.type == "audio_interrupted":
+                    self.echo.interrupt(bot_id)  # the unplayed rest of the reply will never echo back
+
+                # full history dumps / base64 audio only when a UI observer consumes them
+                t0 = PROFILER.start()
+                payload = await self._serialize_event(
+                    event,
+                    with_history=self.ui_hub.wants(bot_id, "history"),
+                    with_audio=self.ui_hub.wants(bot_id, "audio"),
+                )
+                if t0:
+                    PROFILER.stop(bot_id, f"pump;serialize;{event.type}", t0)
+                if self.capture.enabled:
+                    self._capture_event(bot_id, event, payload)
+
+                # Send audio to Meetstream in the format negotiated at handshake
+                # (default: pcm16 upsampled to OUTGOING_AUDIO_RATE, e.g., 48k)
                 ws = self.ms_control_ws.get(bot_id)
                 if ws and ws.client_state == WebSocketState.CONNECTED:
-                    if payload.get("type") == "audio":
-                        audio_b64 = payload.get("audio")
-                        if audio_b64:
-                            raw_24k = base64.b64decode(audio_b64)  # model outputs 24k PCM16
-                            raw_out  = _resample_pcm16(raw_24k, 24000, OUTGOING_AUDIO_RATE)
-                            audio_out_b64 = base64.b64encode(raw_out).decode("utf-8")
-                            await _safe_send(ws, {
+                    encoder = self.ms_out_encoders.get(bot_id)
+                    if encoder is None:
+                        encoder = self.ms_out_encoders[bot_id] = OutboundEncoder(OutboundFormat(sample_rate=OUTGOING_AUDIO_RATE))
+                    if event.type == "audio":
+                        raw_24k = event.audio.data  # model outputs 24k PCM16
+                        if raw_24k:
+                            t0 = PROFILER.start()
+                            audio_out_b64 = await self.audio_pool.run(
+                                f"{bot_id}:out", len(raw_24k), _prepare_outbound, self.echo, encoder, bot_id, raw_24k
+                            )
+                            if t0:
+                                PROFILER.stop(bot_id, "pump;audio_out;transform", t0)
+                                t0 = PROFILER.start()
+                            await self._send_control(bot_id, ws, {
                                 "command": "sendaudio",
                                 "audiochunk": audio_out_b64,
                                 "bot_id": bot_id,
-                                "sample_rate": OUTGOING_AUDIO_RATE,
-                                "encoding": "pcm16",
-                                "channels": 1,
-                                "endianness": "little"
+                                **encoder.format.envelope_fields(),
                             })
+                            if t0:
+                                PROFILER.stop(bot_id, "pump;audio_out;send", t0)
+                            self._last_audio_out[bot_id] = time.monotonic()
 
                     if payload.get("type") == "audio_interrupted":
-                        await _safe_send(ws, {
+                        encoder.reset()
+                        await self._send_control(bot_id, ws, {
                             "command": "sendaudio",
                             "audiochunk": "",
                             "bot_id": bot_id
                         })
 
                     # Forward tool outputs (e.g., Playwright search results, Canva designs) to Meetstream control
-                    if payload.get("type") == "tool_end":
-                        tool_name = payload.get("tool")
-                        raw_output = payload.get("output")
-                        pretty_message = None
-                        # Try to parse JSON-like outputs (Canva returns JSON with job/result/generated_designs)
-                        try:
-                            parsed = None
-                            if isinstance(raw_output, str):
-                                # raw_output is often a JSON string; attempt to load
-                                parsed = json.loads(raw_output)
-                            elif isinstance(raw_output, dict):
-                                parsed = raw_output
-                            if isinstance(parsed, dict):
-                                job = parsed.get("job")
-                                if isinstance(job, dict):
-                                    result = job.get("result") or {}
-                                    designs = result.get("generated_designs") or []
-                                    links = []
-                                    for d in designs:
-                                        if not isinstance(d, dict):
-                                            continue
-                                        url = d.get("url")
-                                        thumb = (d.get("thumbnail") or {}).get("url") if isinstance(d.get("thumbnail"), dict) else None
-                                        if url:
-                                            links.append((url, thumb))
-                                    if links:
-                                        lines = ["Canva designs generated:" if (tool_name and "canva" in tool_name.lower()) else "Designs generated:"]
-                                        for i, (u, t) in enumerate(links, start=1):
-                                            line = f"{i}. {u}"
-                                            if t:
-                                                line += f" (thumb: {t})"
-                                            lines.append(line)
-                                        pretty_message = "\n".join(lines)
-                        except Exception:
-                            # Ignore parse errors and fall back to raw output
-                            pretty_message = None
+                    if event.type == "tool_end":
                         try:
-                            await _safe_send(ws, {
-                                "command": "sendmsg",
-                                "message": pretty_message if pretty_message else (str(raw_output) if raw_output is not None else ""),
-                                "bot_id": bot_id
-                            })
+                            await self._deliver_tool_output(bot_id, ws, payload.get("tool"), event.output)
                         except Exception as e:
                             logger.warning(f"failed to forward tool output for {bot_id}: {e}")
 
-                # --- 3) (Optional) Mirror to browser UI for debugging ---
-                ui_session_id = self.bot_to_ui.get(bot_id)
-                if ui_session_id and ui_session_id in self.ui_ws:
-                    try:
-                        await self.ui_ws[ui_session_id].send_text(json.dumps(payload))
-                    except Exception:
-                        pass
+                # --- 3) (Optional) Mirror to browser UI observers (queued, never blocks the pump) ---
+                self.ui_hub.publish(bot_id, payload)
 
         except Exception as e:
             logger.error(f"pump events error for {bot_id}: {e}")
 
+        # the session ended on its own (not via close_session): free the slot and per-bot state
+        if self._pump_tasks.get(bot_id) is asyncio.current_task():
+            logger.info(f"[session ended] bot={bot_id}")
+            await self.close_session(bot_id)
+
 
 
-    async def _serialize_event(self, event: RealtimeSessionEvent) -> Dict[str, Any]:
+    async def _serialize_event(
+        self, event: RealtimeSessionEvent, with_history: bool = True, with_audio: bool = True
+    ) -> Dict[str, Any]:
         base_event: Dict[str, Any] = {"type": event.type}
         if event.type == "agent_start":
             base_event["agent"] = event.agent.name
@@ -340,15 +829,22 @@ class BridgeManager:
             base_event["tool"] = event.tool.name
         elif event.type == "tool_end":
             base_event["tool"] = event.tool.name
-            base_event["output"] = str(event.output)
+            output = str(event.output)
+            if len(output) > TOOL_OUTPUT_MAX_TOTAL:
+                output = output[:TOOL_OUTPUT_MAX_TOTAL] + f"\n… [truncated {len(output) - TOOL_OUTPUT_MAX_TOTAL} chars]"
+            base_event["output"] = output
         elif event.type == "audio":
-            base_event["audio"] = base64.b64encode(event.audio.data).decode("utf-8")
+            if with_audio:
+                base_event["audio"] = base64.b64encode(event.audio.data).decode("utf-8")
         elif event.type == "audio_interrupted":
             pass
         elif event.type == "audio_end":
             pass
         elif event.type == "history_updated":
-            base_event["history"] = [item.model_dump(mode="json") for item in event.history]
+            if with_history:
+                base_event["history"] = [item.model_dump(mode="json") for item in event.history]
+            else:
+                base_event["history_len"] = len(event.history)
         elif event.type == "history_added":
             pass
         elif event.type == "guardrail_tripped":
@@ -364,22 +860,6 @@ class BridgeManager:
         return base_event
 
 
-def _extract_assistant_text(history: Optional[list]) -> Optional[str]:
-    """Pulls a last assistant message’s text for convenience."""
-    if not history:
-        return None
-    text = []
-    for item in history:
-        if item.get("type") == "message" and item.get("role") == "assistant":
-            # flatten assistant content chunks
-            for part in item.get("content", []):
-                if part.get("type") in ("text", "input_text") and part.get("text"):
-                    text.append(part["text"])
-                elif part.get("type") in ("input_audio", "audio") and part.get("transcript"):
-                    text.append(part["transcript"])
-    return " ".join(t for t in text if t).strip() or None
-
-
 async def _safe_send(ws: WebSocket, payload: dict):
     try:
         await ws.send_text(json.dumps(payload))
@@ -387,6 +867,27 @@ async def _safe_send(ws: WebSocket, payload: dict):
         logger.warning(f"send failed: {e}")
 
 
+async def _close_ws(ws: WebSocket, code: int):
+    try:
+        if ws.client_state == WebSocketState.CONNECTED:
+            await ws.close(code=code)
+    except Exception:
+        pass
+
+
+async def _refuse(ws: WebSocket, bot_id: Optional[str], err: AdmissionRefused):
+    """Tell the peer this node is saturated and close with 1013 (try again later)."""
+    logger.warning(f"[refused] bot={bot_id} reason={err.reason}")
+    await _safe_send(ws, {
+        "type": "refused",
+        "command": "refused",
+        "bot_id": bot_id,
+        "reason": err.reason,
+        "retry_after": err.retry_after,
+    })
+    await _close_ws(ws, 1013)
+
+
 manager = BridgeManager()
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -395,7 +896,19 @@ manager = BridgeManager()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # SIGUSR1 starts a drain without stopping the process (send SIGTERM once bots have moved)
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGUSR1, lambda: asyncio.ensure_future(manager.drain()))
+    except (NotImplementedError, AttributeError, RuntimeError):
+        pass  # not available on this platform / not the main thread
     yield
+    await manager.shutdown()
+    await asyncio.to_thread(manager.capture.close_all)
+    await asyncio.to_thread(manager.transcripts.close)  # joins the writer thread
+    manager.audio_pool.shutdown()
+    tool_exec.shutdown()
+    stop_queue_logging()  # last: flush the shutdown logs above
 
 app = FastAPI(lifespan=lifespan)
 
@@ -404,26 +917,20 @@ app = FastAPI(lifespan=lifespan)
 async def ui_socket(websocket: WebSocket, session_id: str):
     await websocket.accept()  # handshake first
 
-    # bind bot_id (from ?bot_id=..., else fallback to session_id)
-    q = websocket.scope.get("query_string", b"").decode() if websocket.scope else ""
-    bot_id = None
-    if q:
-        try:
-            for kv in q.split("&"):
-                k, v = kv.split("=")
-                if k == "bot_id":
-                    bot_id = v
-                    break
-        except Exception:
-            pass
-    if not bot_id:
-        bot_id = session_id
+    # bind bot_id (from ?bot_id=..., else fallback to session_id);
+    # ?events=audio,text,tools,history limits what this observer receives (default: all)
+    bot_id = websocket.query_params.get("bot_id") or session_id
+    classes = parse_classes(websocket.query_params.get("events"))
 
     # 👉 ensure the Realtime session is fully created/connected *before* UI sends anything
-    await manager.ensure_session(bot_id)
+    try:
+        await manager.ensure_session(bot_id)
+    except AdmissionRefused as e:
+        await _refuse(websocket, bot_id, e)
+        return
 
     # now link the UI
-    await manager.attach_ui(session_id, websocket, bot_id)
+    await manager.attach_ui(session_id, websocket, bot_id, classes)
 
     # (optional) small ack to the UI
     await _safe_send(websocket, {"type": "ack", "message": f"UI bound {session_id} → {bot_id}"})
@@ -457,7 +964,7 @@ async def ui_socket(websocket: WebSocket, session_id: str):
     except Exception as e:
         logger.error(f"UI socket error: {e}")
     finally:
-        await manager.detach_ui(session_id)
+        await manager.detach_ui(session_id, bot_id)
 
 
 
@@ -468,39 +975,42 @@ async def meetstream_control_bind(websocket: WebSocket):
     bot_id = None
     try:
         # 1) handshake: { "type": "ready", "bot_id": "..." }
-        init = json.loads(await websocket.receive_text())
-        print("Bridge init", init)
+        raw = await websocket.receive_text()
+        init = json.loads(raw)
+        logger.info(f"[control init] {init}")
         if init.get("type") != "ready" or not init.get("bot_id"):
             await websocket.close(code=1003)
             return
         bot_id = init["bot_id"]
 
-        await manager.attach_ms_control(bot_id, websocket)
+        out_format = negotiate_outbound(init, OUTGOING_AUDIO_RATE)
+        try:
+            await manager.attach_ms_control(bot_id, websocket, out_format)
+        except AdmissionRefused as e:
+            await _refuse(websocket, bot_id, e)
+            bot_id = None  # nothing attached, nothing to detach
+            return
+        manager.capture.record(bot_id, cap.CH_CONTROL_IN, raw)
 
-        # optional ack
+        # optional ack (also tells the receiver which sendaudio format it will get)
         await _safe_send(websocket, {
             "command": "sendmsg",
             "message": f"Control channel bound to {bot_id}",
-            "bot_id": bot_id
+            "bot_id": bot_id,
+            "audio_format": out_format.envelope_fields(),
         })
 
         # 2) main loop
         while True:
-            data = json.loads(await websocket.receive_text())
-            cmd = data.get("command")
-            if cmd == "usermsg":
-                msg = data.get("message", "")
-                if msg:
-                    await manager.ingest_ms_text(bot_id, msg)
-            elif cmd == "interrupt":
-                await manager.interrupt(bot_id)
-            # (extend with other commands as needed)
+            raw = await websocket.receive_text()
+            manager.capture.record(bot_id, cap.CH_CONTROL_IN, raw)
+            await manager.handle_ms_command(bot_id, json.loads(raw))
 
     except WebSocketDisconnect:
         pass
     finally:
         if bot_id:
-            await manager.detach_ms_control(bot_id)
+            await manager.detach_ms_control(bot_id, websocket)
 
 
 # ----- 3) Meetstream audio ingest channel ---------------------------------------
@@ -510,14 +1020,21 @@ async def meetstream_audio_bind(websocket: WebSocket):
     bot_id = None
     try:
         # 1) handshake: { "type": "ready", "bot_id": "..." }
-        init = json.loads(await websocket.receive_text())
-        print("Audio init", init)
+        raw = await websocket.receive_text()
+        init = json.loads(raw)
+        logger.info(f"[audio init] {init}")
         if init.get("type") != "ready" or not init.get("bot_id"):
             await websocket.close(code=1003)
             return
         bot_id = init["bot_id"]
 
-        await manager.ensure_session(bot_id)
+        try:
+            await manager.attach_ms_audio(bot_id, websocket)
+        except AdmissionRefused as e:
+            await _refuse(websocket, bot_id, e)
+            bot_id = None
+            return
+        manager.capture.record(bot_id, cap.CH_AUDIO_IN, raw)
 
         # optional ack
         await _safe_send(websocket, {
@@ -527,26 +1044,137 @@ async def meetstream_audio_bind(websocket: WebSocket):
 
         # 2) chunk loop
         while True:
-            # print("waiting for audio chunk")
-            data = json.loads(await websocket.receive_text())
-            # print("audio chunk received", data)
-            if data.get("type") != "PCMChunk":
-                continue
-            speaker = data.get("speakerName", "")
-            if speaker in IGNORED_SPEAKERS:
-                # print("audio chunk received", data)
-                # silently ignore agent/self audio
-                continue
-            print("got audio chunk", data.get("speakerName"))
-            b64 = data.get("audioData")
-            if b64:
-                await manager.ingest_ms_audio_b64(bot_id, b64)
+            raw = await websocket.receive_text()
+            manager.capture.record(bot_id, cap.CH_AUDIO_IN, raw)
+            await manager.handle_ms_audio_frame(bot_id, json.loads(raw))
 
     except WebSocketDisconnect:
         pass
     finally:
-        # no control ws to detach here
-        ...
+        if bot_id:
+            await manager.detach_ms_audio(bot_id, websocket)
+
+
+# ----- 4) Admin: self-audio filtering --------------------------------------------
+@app.get("/admin/ignored-speakers")
+async def get_ignored_speakers():
+    return {
+        "speakers": sorted(manager.ignored_speakers),
+        "echo": {
+            "enabled": manager.echo.enabled,
+            "suppressed": manager.echo.suppressed,
+            "attenuated": manager.echo.attenuated,
+        },
+    }
+
+@app.put("/admin/ignored-speakers", dependencies=[Depends(require_admin)])
+async def set_ignored_speakers(speakers: List[str] = Body(..., embed=True)):
+    manager.ignored_speakers = {s.strip() for s in speakers if s and s.strip()}
+    logger.info(f"ignored speakers set to {sorted(manager.ignored_speakers)}")
+    return {"speakers": sorted(manager.ignored_speakers)}
+
+
+# ----- 5) Admin: audio worker pool -----------------------------------------------
+@app.get("/admin/audio-pool")
+async def audio_pool_stats():
+    return manager.audio_pool.stats()
+
+
+# ----- 6) Admin: admission control -----------------------------------------------
+@app.get("/admin/admission")
+async def admission_stats():
+    return manager.admission_stats()
+
+
+# ----- 7) Admin: per-bot speaker mixer ---------------------------------------------
+@app.get("/admin/mixer/{bot_id}", dependencies=[Depends(require_admin)])  # exposes participant names
+async def mixer_activity(bot_id: str):
+    mixer = manager.mixers.get(bot_id)
+    return mixer.activity() if mixer else {"enabled": MIX_ENABLED, "speakers": {}}
+
+
+# ----- 8) Transcripts ------------------------------------------------------------
+@app.get("/transcripts/search", dependencies=[Depends(require_admin)])
+async def transcripts_search(q: str, bot_id: Optional[str] = None, limit: int = 20):
+    if not manager.transcripts.enabled:
+        return {"results": []}
+    return {"results": await asyncio.to_thread(manager.transcripts.search, q, bot_id, min(limit, 200))}
+
+@app.get("/transcripts/{bot_id}/recent", dependencies=[Depends(require_admin)])
+async def transcripts_recent(bot_id: str, limit: int = 50):
+    if not manager.transcripts.enabled:
+        return {"bot_id": bot_id, "turns": []}
+    return {"bot_id": bot_id, "turns": await asyncio.to_thread(manager.transcripts.recent, bot_id, min(limit, 500))}
+
+@app.get("/transcripts/{bot_id}/last-assistant", dependencies=[Depends(require_admin)])
+async def transcripts_last_assistant(bot_id: str):
+    text = manager.transcripts.last_assistant(bot_id)
+    if text is None and manager.transcripts.enabled:
+        # bot no longer live: one indexed lookup
+        text = await asyncio.to_thread(manager.transcripts.last_assistant_from_db, bot_id)
+    return {"bot_id": bot_id, "text": text}
+
+
+# ----- 9) Drain / health ----------------------------------------------------------
+@app.post("/admin/drain", dependencies=[Depends(require_admin)])
+async def admin_drain(deadline_s: float = DRAIN_DEADLINE_S):
+    # run in the background so the caller (deploy tooling) gets an answer right away
+    asyncio.ensure_future(manager.drain(deadline_s))
+    return {"draining": True, "live": len(manager.sessions), "deadline_s": deadline_s}
+
+@app.post("/admin/resume", dependencies=[Depends(require_admin)])
+async def admin_resume():
+    manager.resume()
+    return {"draining": False, "live": len(manager.sessions)}
+
+@app.get("/healthz")
+async def healthz():
+    if manager.draining:
+        return JSONResponse({"status": "draining", "live": len(manager.sessions)}, status_code=503)
+    return {"status": "ok", "live": len(manager.sessions)}
+
+
+# ----- 10) Admin: profiling -------------------------------------------------------
+_profile_lock = asyncio.Lock()
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 10, mode: str = "stages", bot_id: Optional[str] = None):
+    """
+    Profile for `seconds` and return collapsed stacks (flamegraph.pl / speedscope).
+    mode=stages: per-stage pipeline timers (µs), optionally for one bot_id.
+    mode=sample: whole-process Python stack sampler (sample counts).
+    """
+    if mode not in ("stages", "sample"):
+        return JSONResponse({"error": "mode must be 'stages' or 'sample'"}, status_code=400)
+    if _profile_lock.locked():
+        return JSONResponse({"error": "a profile is already running"}, status_code=409)
+    seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+    async with _profile_lock:
+        if mode == "stages":
+            PROFILER.begin(bot_id)
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                out = PROFILER.end()
+        else:
+            SAMPLER.begin()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                out = SAMPLER.end()
+    return PlainTextResponse(out, headers={"Content-Disposition": f'attachment; filename="bridge-{mode}.folded"'})
+
+
+# ----- 11) Admin: tool execution -------------------------------------------------
+@app.get("/admin/tools")
+async def tool_stats():
+    return TOOL_STATS.snapshot()
+
+
+# ----- 12) Admin: UI observers ----------------------------------------------------
+@app.get("/admin/ui")
+async def ui_observers():
+    return manager.ui_hub.stats()
 
 
 # ----- Static UI (optional) ------------------------------------------------------
@@ -0,0 +1,207 @@
+# tool_exec.py — deadlines, thread offload, stats and concurrent dispatch for agent tools
+#
+# Every FunctionTool the agent exposes (local @function_tool and MCP tools, which
+# the SDK converts to FunctionTools on each lookup) is wrapped by GuardedRealtimeAgent:
+# the call gets a deadline and, on timeout or error, a short result the model can
+# say out loud instead of leaving the meeting silent.
+import asyncio
+import dataclasses
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from agents import FunctionTool
+from agents.exceptions import UserError
+from agents.mcp.util import MCPUtil
+from agents.realtime import RealtimeAgent
+
+logger = logging.getLogger("bridge.tools")
+
+TOOL_TIMEOUT_S = float(os.getenv("TOOL_TIMEOUT_S", "10"))          # local tools
+TOOL_MCP_TIMEOUT_S = float(os.getenv("TOOL_MCP_TIMEOUT_S", "30"))  # MCP tools whose server sets no session timeout
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "4"))                 # threads for synchronous tools
+TOOL_PARALLEL = os.getenv("TOOL_PARALLEL", "1").lower() in ("1", "true", "yes")
+
+
+def _parse_timeouts(spec: str) -> Dict[str, float]:
+    """"name=seconds,name=seconds" -> {name: seconds}."""
+    out: Dict[str, float] = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        try:
+            if name.strip():
+                out[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"ignoring bad TOOL_TIMEOUTS entry: {entry!r}")
+    return out
+
+
+# per-tool overrides, e.g. TOOL_TIMEOUTS="weather_now=5,generate-design=60"
+TOOL_TIMEOUTS = _parse_timeouts(os.getenv("TOOL_TIMEOUTS", ""))
+
+_sync_pool = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+
+
+def run_in_thread(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Make a synchronous tool async by running it on the tool thread pool.
+
+    Apply under @function_tool; the signature and docstring are preserved, so
+    the generated schema is unchanged.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_sync_pool, functools.partial(fn, *args, **kwargs))
+
+    return wrapper
+
+
+class ToolStats:
+    """Per-tool call counts, timeouts, errors and latency percentiles."""
+
+    def __init__(self, window: int = 512):
+        self._window = window
+        self._lock = threading.Lock()
+        self._latency: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self.in_flight = 0
+
+    def record(self, tool: str, seconds: float, outcome: str):
+        with self._lock:
+            self._latency.setdefault(tool, deque(maxlen=self._window)).append(seconds)
+            counts = self._counts.setdefault(tool, {"calls": 0, "ok": 0, "timeouts": 0, "errors": 0})
+            counts["calls"] += 1
+            counts["timeouts" if outcome == "timeout" else "errors" if outcome == "error" else "ok"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tools = {name: (dict(counts), sorted(self._latency.get(name, ()))) for name, counts in self._counts.items()}
+
+        def pct(values: List[float], p: float) -> float:
+            return values[min(len(values) - 1, int(p * len(values)))] * 1000 if values else 0.0
+
+        return {
+            "in_flight": self.in_flight,
+            "parallel": TOOL_PARALLEL,
+            "tools": {
+                name: {
+                    **counts,
+                    "timeout_s": timeout_for(name),
+                    "latency_ms": {
+                        "p50": pct(lat, 0.50),
+                        "p95": pct(lat, 0.95),
+                        "max": lat[-1] * 1000 if lat else 0.0,
+                    },
+                }
+                for name, (counts, lat) in sorted(tools.items())
+            },
+        }
+
+
+TOOL_STATS = ToolStats()
+
+# MCP tool name -> its server's client_session_timeout_seconds (filled on each tool lookup)
+_MCP_TIMEOUTS: Dict[str, float] = {}
+
+
+def timeout_for(tool_name: str) -> float:
+    if tool_name in TOOL_TIMEOUTS:
+        return TOOL_TIMEOUTS[tool_name]
+    return _MCP_TIMEOUTS.get(tool_name, TOOL_TIMEOUT_S)
+
+
+def _spoken_fallback(tool_name: str, timed_out: bool) -> str:
+    name = tool_name.replace("_", " ").replace("-", " ")
+    if timed_out:
+        return f"{name} took too long and didn't return a result. Tell the user it timed out and offer to try again."
+    return f"{name} ran into a problem and didn't return a result. Tell the user briefly and offer to try again."
+
+
+def guard_tool(tool: FunctionTool, timeout_s: Optional[float] = None) -> FunctionTool:
+    """Copy of `tool` whose invocation is bounded by a deadline and never raises."""
+    if getattr(tool.on_invoke_tool, "_guarded", False):
+        return tool
+    invoke = tool.on_invoke_tool
+    name = tool.name
+
+    async def guarded(ctx: Any, input_json: str) -> Any:
+        deadline = timeout_s if timeout_s is not None else timeout_for(name)
+        started = time.perf_counter()
+        TOOL_STATS.in_flight += 1
+        try:
+            result = await asyncio.wait_for(invoke(ctx, input_json), timeout=deadline)
+        except asyncio.TimeoutError:
+            TOOL_STATS.record(name, time.perf_counter() - started, "timeout")
+            logger.warning(f"tool {name} timed out after {deadline:.1f}s")
+            return _spoken_fallback(name, timed_out=True)
+        except Exception as e:
+            TOOL_STATS.record(name, time.perf_counter() - started, "error")
+            logger.warning(f"tool {name} failed: {e!r}")
+            return _spoken_fallback(name, timed_out=False)
+        finally:
+            TOOL_STATS.in_flight -= 1
+        TOOL_STATS.record(name, time.perf_counter() - started, "ok")
+        return result
+
+    guarded._guarded = True  # type: ignore[attr-defined]
+    return dataclasses.replace(tool, on_invoke_tool=guarded)
+
+
+class GuardedRealtimeAgent(RealtimeAgent):
+    """RealtimeAgent whose function and MCP tools all go through guard_tool()."""
+
+    async def get_mcp_tools(self, run_context):
+        # same as the SDK's lookup, but per server so each tool inherits its server's timeout
+        strict = self.mcp_config.get("convert_schemas_to_strict", False)
+        tools: List[Any] = []
+        for server in self.mcp_servers:
+            server_tools = await MCPUtil.get_function_tools(server, strict, run_context, self)
+            dupes = {t.name for t in server_tools} & {t.name for t in tools}
+            if dupes:
+                raise UserError(f"Duplicate tool names found across MCP servers: {dupes}")
+            timeout = getattr(server, "client_session_timeout_seconds", None) or TOOL_MCP_TIMEOUT_S
+            _MCP_TIMEOUTS.update((t.name, timeout) for t in server_tools)
+            tools.extend(server_tools)
+        return tools
+
+    async def get_all_tools(self, run_context):
+        tools = await super().get_all_tools(run_context)
+        return [guard_tool(t) if isinstance(t, FunctionTool) else t for t in tools]
+
+
+def install_parallel_dispatch(session: Any) -> Optional[Set[asyncio.Task]]:
+    """
+    Run each tool call of a RealtimeSession as its own task.
+
+    The SDK (0.2.x) awaits tool calls inside the model event listener, so calls
+    from one turn run one after another and audio/events stall meanwhile. This
+    swaps the session's handler for one that spawns a task and returns; the
+    returned set holds the in-flight tasks so they can be cancelled on close.
+    """
+    handle = getattr(session, "_handle_tool_call", None)
+    if not TOOL_PARALLEL or handle is None:
+        return None
+    tasks: Set[asyncio.Task] = set()
+
+    def done(task: asyncio.Task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"tool dispatch failed: {task.exception()!r}")
+
+    async def dispatch(event: Any):
+        task = asyncio.create_task(handle(event), name=f"tool:{getattr(event, 'name', '?')}")
+        tasks.add(task)
+        task.add_done_callback(done)
+
+    session._handle_tool_call = dispatch
+    return tasks
+
+
+def shutdown():
+    _sync_pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,105 @@
+# tool_output.py — turns tool_end outputs into size-bounded sendmsg messages
+import json
+import os
+from typing import Any, Callable, List, Optional, Tuple
+
+TOOL_OUTPUT_MAX_CHARS = int(os.getenv("TOOL_OUTPUT_MAX_CHARS", "4000"))      # first sendmsg, sent right away
+TOOL_OUTPUT_CHUNK_CHARS = int(os.getenv("TOOL_OUTPUT_CHUNK_CHARS", "4000"))  # follow-up sendmsg size
+TOOL_OUTPUT_MAX_TOTAL = int(os.getenv("TOOL_OUTPUT_MAX_TOTAL", "64000"))     # everything past this is dropped
+TOOL_OUTPUT_AUDIO_QUIET_MS = int(os.getenv("TOOL_OUTPUT_AUDIO_QUIET_MS", "300"))  # follow-ups wait for a gap in audio
+
+# parse JSON only if it looks like JSON and is not absurdly large
+_MAX_PARSE_CHARS = int(os.getenv("TOOL_OUTPUT_MAX_PARSE_CHARS", str(2 * 1024 * 1024)))
+
+# formatter(tool_name, parsed, text) -> message or None to fall through
+Formatter = Callable[[Optional[str], Any, str], Optional[str]]
+_FORMATTERS: List[Tuple[Callable[[Optional[str]], bool], Formatter]] = []
+
+
+def tool_formatter(match: Optional[Callable[[Optional[str]], bool]] = None):
+    """Register a formatter; `match(tool_name)` picks the tools it applies to (default: all)."""
+    def register(fn: Formatter) -> Formatter:
+        _FORMATTERS.append((match or (lambda name: True), fn))
+        return fn
+    return register
+
+
+def parse_tool_output(raw: Any) -> Tuple[Any, str]:
+    """(parsed JSON or None, text) — the output is parsed at most once."""
+    if isinstance(raw, (dict, list)):
+        return raw, json.dumps(raw, ensure_ascii=False, default=str)
+    text = "" if raw is None else str(raw)
+    stripped = text.lstrip()[:1]
+    if stripped in ("{", "[") and len(text) <= _MAX_PARSE_CHARS:
+        try:
+            return json.loads(text), text
+        except ValueError:
+            pass
+    return None, text
+
+
+def format_tool_output(tool_name: Optional[str], raw: Any) -> str:
+    parsed, text = parse_tool_output(raw)
+    for match, fmt in _FORMATTERS:
+        if not match(tool_name):
+            continue
+        try:
+            message = fmt(tool_name, parsed, text)
+        except Exception:
+            message = None  # a broken formatter falls back to the raw text
+        if message:
+            return message
+    return text
+
+
+def split_for_delivery(message: str) -> List[str]:
+    """First part within TOOL_OUTPUT_MAX_CHARS, the rest in TOOL_OUTPUT_CHUNK_CHARS parts."""
+    if len(message) > TOOL_OUTPUT_MAX_TOTAL:
+        dropped = len(message) - TOOL_OUTPUT_MAX_TOTAL
+        message = message[:TOOL_OUTPUT_MAX_TOTAL] + f"\n… [truncated {dropped} chars]"
+    if len(message) <= TOOL_OUTPUT_MAX_CHARS:
+        return [message]
+    parts = [message[:TOOL_OUTPUT_MAX_CHARS]]
+    for i in range(TOOL_OUTPUT_MAX_CHARS, len(message), TOOL_OUTPUT_CHUNK_CHARS):
+        parts.append(message[i: i + TOOL_OUTPUT_CHUNK_CHARS])
+    n = len(parts)
+    return [f"(part {i}/{n}) {p}" for i, p in enumerate(parts, start=1)]
+
+
+# ───────────────────────────────── Formatters ─────────────────────────────────
+
+@tool_formatter()
+def _generated_designs(tool_name: Optional[str], parsed: Any, text: str) -> Optional[str]:
+    """Canva (and similar) jobs: list generated design links instead of the raw JSON."""
+    if not isinstance(parsed, dict):
+        return None
+    job = parsed.get("job")
+    if not isinstance(job, dict):
+        return None
+    result = job.get("result") or {}
+    designs = result.get("generated_designs") or []
+    links = []
+    for d in designs:
+        if not isinstance(d, dict):
+            continue
+        url = d.get("url")
+        thumb = (d.get("thumbnail") or {}).get("url") if isinstance(d.get("thumbnail"), dict) else None
+        if url:
+            links.append((url, thumb))
+    if not links:
+        return None
+    lines = ["Canva designs generated:" if (tool_name and "canva" in tool_name.lower()) else "Designs generated:"]
+    for i, (u, t) in enumerate(links, start=1):
+        line = f"{i}. {u}"
+        if t:
+            line += f" (thumb: {t})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+@tool_formatter()
+def _compact_large_json(tool_name: Optional[str], parsed: Any, text: str) -> Optional[str]:
+    """Pretty-printed JSON over budget: re-dump compactly before it gets chunked."""
+    if parsed is None or len(text) <= TOOL_OUTPUT_MAX_CHARS:
+        return None
+    return json.dumps(parsed, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -0,0 +1,253 @@
+# transcripts.py — incremental per-bot transcript store (SQLite + FTS5), written off the event loop
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("bridge.transcripts")
+
+TRANSCRIPT_DB = os.getenv("TRANSCRIPT_DB", "")                        # path to the SQLite file; unset = store off
+TRANSCRIPT_FLUSH_MS = int(os.getenv("TRANSCRIPT_FLUSH_MS", "250"))     # max delay before a batch is written
+TRANSCRIPT_BATCH = int(os.getenv("TRANSCRIPT_BATCH", "200"))           # max rows per transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    bot_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (bot_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS turns_bot_id ON turns (bot_id, id);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(text, content='turns', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS turns_ai AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_au AFTER UPDATE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO turns_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_ad AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO turns (bot_id, item_id, role, text, created_at, updated_at)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (bot_id, item_id) DO UPDATE SET
+    role = excluded.role, text = excluded.text, updated_at = excluded.updated_at
+"""
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def item_text(item: Any) -> Optional[Tuple[str, str, str]]:
+    """(item_id, role, text) for a history message item (model or dict), else None."""
+    if _field(item, "type") != "message":
+        return None
+    item_id, role = _field(item, "item_id"), _field(item, "role")
+    if not item_id or role not in ("user", "assistant"):
+        return None
+    parts = []
+    for part in _field(item, "content") or []:
+        kind = _field(part, "type")
+        if kind in ("text", "input_text") and _field(part, "text"):
+            parts.append(_field(part, "text"))
+        elif kind in ("input_audio", "audio") and _field(part, "transcript"):
+            parts.append(_field(part, "transcript"))
+    text = " ".join(parts).strip()
+    return (item_id, role, text) if text else None
+
+
+class TranscriptStore:
+    """
+    Builds each bot's transcript incrementally from history/transcript events.
+
+    The event-loop side only diffs items against an in-memory cache and queues
+    changed rows; a writer thread batches them into SQLite. The last assistant
+    message per bot is kept in memory, so looking it up is O(1).
+    """
+
+    def __init__(self, path: Optional[str] = TRANSCRIPT_DB):
+        self.path = path
+        self.enabled = bool(path)
+        self.fts = False
+        self._seen: Dict[str, Dict[str, str]] = {}    # bot_id -> item_id -> text already queued
+        self._last_assistant: Dict[str, str] = {}
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if self.enabled:
+            self._init_db()
+            self._writer = threading.Thread(target=self._write_loop, name="transcripts", daemon=True)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")  # readers never block the writer
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError as e:
+                logger.warning(f"FTS5 unavailable, transcript search falls back to LIKE: {e}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ── event-loop side ───────────────────────────────────────────────────────
+    def _observe(self, bot_id: str, item_id: str, role: str, text: str):
+        seen = self._seen.setdefault(bot_id, {})
+        if seen.get(item_id) == text:
+            return
+        seen[item_id] = text
+        if role == "assistant":
+            self._last_assistant[bot_id] = text
+        now = time.time()
+        self._queue.put((bot_id, item_id, role, text, now, now))
+
+    def observe_item(self, bot_id: str, item: Any):
+        if not self.enabled:
+            return
+        row = item_text(item)
+        if row:
+            self._observe(bot_id, *row)
+
+    def observe_history(self, bot_id: str, history: List[Any]):
+        """Only items whose text changed since the last call are written."""
+        if not self.enabled:
+            return
+        for item in history:
+            row = item_text(item)
+            if row:
+                self._observe(bot_id, *row)
+
+    def observe_transcript(self, bot_id: str, item_id: str, transcript: str, role: str = "user"):
+        if self.enabled and item_id and transcript:
+            self._observe(bot_id, item_id, role, transcript.strip())
+
+    def last_assistant(self, bot_id: str) -> Optional[str]:
+        return self._last_assistant.get(bot_id)
+
+    def close_bot(self, bot_id: str):
+        self._seen.pop(bot_id, None)
+        self._last_assistant.pop(bot_id, None)
+
+    # ── writer thread ─────────────────────────────────────────────────────────
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                row = self._queue.get()
+                if row is None:
+                    return
+                batch = [row]
+                deadline = time.monotonic() + TRANSCRIPT_FLUSH_MS / 1000
+                stop = False
+                while len(batch) < TRANSCRIPT_BATCH:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if row is None:
+                        stop = True
+                        break
+                    batch.append(row)
+                try:
+                    with conn:
+                        conn.executemany(_UPSERT, batch)
+                except sqlite3.Error as e:
+                    logger.error(f"transcript write failed ({len(batch)} rows): {e}")
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def close(self):
+        """Flush queued rows and stop the writer."""
+        if self._writer is not None:
+            self._queue.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+    # ── queries (blocking; call via asyncio.to_thread) ─────────────────────────
+    def recent(self, bot_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT item_id, role, text, created_at, updated_at FROM turns"
+                " WHERE bot_id = ? ORDER BY id DESC LIMIT ?",
+                (bot_id, limit),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in reversed(rows)]
+
+    def search(self, query: str, bot_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            if self.fts:
+                sql = (
+                    "SELECT t.bot_id, t.item_id, t.role, t.text, t.updated_at,"
+                    " snippet(turns_fts, 0, '[', ']', '…', 12) AS snippet"
+                    " FROM turns_fts JOIN turns t ON t.id = turns_fts.rowid"
+                    " WHERE turns_fts MATCH ?"
+                )
+                # every word must match, anywhere in the turn; each one is quoted so
+                # user input cannot inject FTS syntax
+                terms = re.findall(r"\w+", query)
+                if not terms:
+                    return []
+                params: List[Any] = [" ".join('"' + t + '"' for t in terms)]
+                if bot_id:
+                    sql += " AND t.bot_id = ?"
+                    params.append(bot_id)
+                sql += " ORDER BY bm25(turns_fts) LIMIT ?"
+            else:
+                terms = query.split()
+                if not terms:
+                    return []
+                sql = "SELECT bot_id, item_id, role, text, updated_at, text AS snippet FROM turns WHERE "
+                sql += " AND ".join(["text LIKE ?"] * len(terms))
+                params = [f"%{t}%" for t in terms]
+                if bot_id:
+                    sql += " AND bot_id = ?"
+                    params.append(bot_id)
+                sql += " ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+    def last_assistant_from_db(self, bot_id: str) -> Optional[str]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT text FROM turns WHERE bot_id = ? AND role = 'assistant' ORDER BY id DESC LIMIT 1",
+                (bot_id,),
+            ).fetchone()
+        finally:
+            conn.close()
+        return row["text"] if row else None
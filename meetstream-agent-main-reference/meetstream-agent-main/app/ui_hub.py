@@ -0,0 +1,179 @@
+# ui_hub.py — per-bot fan-out of session events to any number of UI observer sockets
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+logger = logging.getLogger("bridge.ui")
+
+UI_QUEUE_MAX = int(os.getenv("UI_QUEUE_MAX", "256"))                  # queued messages per observer
+UI_SEND_TIMEOUT_S = float(os.getenv("UI_SEND_TIMEOUT_S", "5"))         # one send stuck this long drops the observer
+UI_MAX_OVERFLOWS = int(os.getenv("UI_MAX_OVERFLOWS", "3"))             # consecutive overflows before dropping
+
+EVENT_CLASSES = ("audio", "text", "tools", "history")
+
+_CLASS_OF = {
+    "audio": "audio",
+    "audio_interrupted": "audio",
+    "audio_end": "audio",
+    "tool_start": "tools",
+    "tool_end": "tools",
+    "handoff": "tools",
+    "history_updated": "history",
+    "history_added": "history",
+}
+
+
+def event_class(event_type: Optional[str]) -> str:
+    """Subscription class of a serialized session event; anything unlisted is "text"."""
+    return _CLASS_OF.get(event_type or "", "text")
+
+
+def parse_classes(spec: Optional[str]) -> Set[str]:
+    """"audio,tools" -> {"audio", "tools"}; empty/None -> every class."""
+    if not spec:
+        return set(EVENT_CLASSES)
+    classes = {c.strip().lower() for c in spec.split(",")} & set(EVENT_CLASSES)
+    return classes or set(EVENT_CLASSES)
+
+
+class _Observer:
+    def __init__(self, bot_id: str, session_id: str, ws: WebSocket, classes: Set[str]):
+        self.bot_id = bot_id
+        self.session_id = session_id
+        self.ws = ws
+        self.classes = classes
+        self.queue: Deque[str] = deque()
+        self.snapshot: Optional[str] = None   # latest history snapshot, coalesced
+        self.wake = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.overflows = 0
+        self.sent = 0
+        self.dropped = 0
+
+
+class UIHub:
+    """
+    Broadcasts each bot's session events to its observers without blocking the pump.
+
+    publish() serializes an event once and only appends to per-observer queues;
+    a writer task per observer does the actual sends. History snapshots are
+    coalesced (only the newest is kept). An observer whose queue overflows loses
+    what was queued and catches up from the next snapshot; after UI_MAX_OVERFLOWS
+    overflows in a row, or one send stuck past UI_SEND_TIMEOUT_S, it is dropped.
+    """
+
+    def __init__(self, queue_max: int = UI_QUEUE_MAX):
+        self.queue_max = queue_max
+        self._by_bot: Dict[str, List[_Observer]] = {}
+        self._by_session: Dict[str, _Observer] = {}
+        self.observers_dropped = 0
+
+    def subscribe(self, bot_id: str, session_id: str, ws: WebSocket, classes: Iterable[str] = EVENT_CLASSES):
+        self.unsubscribe(session_id)
+        obs = _Observer(bot_id, session_id, ws, set(classes))
+        self._by_bot.setdefault(bot_id, []).append(obs)
+        self._by_session[session_id] = obs
+        obs.task = asyncio.create_task(self._writer(obs))
+
+    def unsubscribe(self, session_id: str) -> Optional[str]:
+        """Remove an observer; returns the bot it was watching."""
+        obs = self._by_session.pop(session_id, None)
+        if obs is None:
+            return None
+        observers = self._by_bot.get(obs.bot_id, [])
+        if obs in observers:
+            observers.remove(obs)
+        if not observers:
+            self._by_bot.pop(obs.bot_id, None)
+        if obs.task is not None and obs.task is not asyncio.current_task():
+            obs.task.cancel()
+        return obs.bot_id
+
+    def has_observers(self, bot_id: str) -> bool:
+        return bool(self._by_bot.get(bot_id))
+
+    def wants(self, bot_id: str, cls: str) -> bool:
+        return any(cls in o.classes for o in self._by_bot.get(bot_id, ()))
+
+    def publish(self, bot_id: str, payload: Dict[str, Any]):
+        observers = self._by_bot.get(bot_id)
+        if not observers:
+            return
+        event_type = payload.get("type")
+        cls = event_class(event_type)
+        targets = [o for o in observers if cls in o.classes]
+        if not targets:
+            return
+        text = json.dumps(payload)
+        for obs in targets:
+            if event_type == "history_updated":
+                obs.snapshot = text
+            elif len(obs.queue) >= self.queue_max:
+                obs.overflows += 1
+                obs.dropped += len(obs.queue)
+                obs.queue.clear()
+                if obs.overflows >= UI_MAX_OVERFLOWS:
+                    self._drop(obs, "lagging")
+                    continue
+                obs.queue.append(text)
+            else:
+                obs.queue.append(text)
+            obs.wake.set()
+
+    async def _writer(self, obs: _Observer):
+        try:
+            while True:
+                await obs.wake.wait()
+                obs.wake.clear()
+                while obs.queue or obs.snapshot is not None:
+                    if obs.queue:
+                        text = obs.queue.popleft()
+                    else:
+                        text, obs.snapshot = obs.snapshot, None
+                    await asyncio.wait_for(obs.ws.send_text(text), timeout=UI_SEND_TIMEOUT_S)
+                    obs.sent += 1
+                obs.overflows = 0  # caught up
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self._drop(obs, "send timeout")
+        except Exception as e:
+            logger.info(f"[ui] observer {obs.session_id} send failed: {e!r}")
+            self.unsubscribe(obs.session_id)
+
+    def _drop(self, obs: _Observer, reason: str):
+        self.observers_dropped += 1
+        logger.warning(f"[ui] dropping observer {obs.session_id} of bot={obs.bot_id}: {reason}")
+        self.unsubscribe(obs.session_id)
+        asyncio.ensure_future(self._close(obs.ws))
+
+    @staticmethod
+    async def _close(ws: WebSocket):
+        try:
+            await ws.close(code=1013)  # try again later
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_max": self.queue_max,
+            "observers_dropped": self.observers_dropped,
+            "bots": {
+                bot_id: [
+                    {
+                        "session_id": o.session_id,
+                        "classes": sorted(o.classes),
+                        "queued": len(o.queue),
+                        "sent": o.sent,
+                        "dropped": o.dropped,
+                    }
+                    for o in observers
+                ]
+                for bot_id, observers in self._by_bot.items()
+            },
+        }